@@ -19,7 +19,7 @@ VERSION = ''
 # What packages are required for this module to be executed?
 REQUIRED = [
     'numpy>=1.20.0',  # cannot be 1.19.4, see https://tinyurl.com/y3dm3h86
-    'pyproj>=3.0.1',
+    'pyproj>=3.1',
 ]
 
 # What packages are optional?
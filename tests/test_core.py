@@ -29,6 +29,31 @@ def test_read_regional_config():
     assert data == expected_data
 
 
+def test_set_other_paths_skips_invalid_config(tmp_path):
+    for region, config_text in [('good_region', '[Datum]\nreference_frame = NAD83(2011)\nreference_geoid = core\\geoid12b\\g2012bu0.gtx\nuncertainty_mllw = 0.1\n'),
+                                ('bad_region', '[Datum]\nuncertainty_mllw = 0.1\n')]:
+        os.makedirs(os.path.join(tmp_path, region))
+        for ext in ['.gtx', '.kml']:
+            open(os.path.join(tmp_path, region, 'mllw' + ext if ext == '.gtx' else region + ext), 'w').close()
+        with open(os.path.join(tmp_path, region, region + '.config'), 'w') as configfile:
+            configfile.write(config_text)
+    datum_data = DatumData()
+    datum_data.set_other_paths({'test_path': str(tmp_path)})
+    assert datum_data.extended_region_lookup['test_path'] == ['good_region']
+    assert 'bad_region' not in datum_data.regions
+    assert 'bad_region' not in datum_data.extended_region
+    assert datum_data.extended_region['good_region']['reference_frame'] == 'NAD83(2011)'
+    assert datum_data.uncertainties['good_region'] == {'mllw': '0.1'}
+
+
+def test_scan_datum_directory():
+    import glob
+    vdatum_path = gvc.datum_data.vdatum_path
+    file_list = scan_datum_directory(vdatum_path)
+    assert sorted(file_list) == sorted(fil for fil in glob.glob(os.path.join(vdatum_path, '*/*')) if os.path.isfile(fil))
+    assert get_region_polygons(vdatum_path, file_list=file_list) == gvc.datum_data.polygon_files
+
+
 def test_regions():
     vc = VyperCore()
     vc.set_input_datum((6318, 'mllw'))
@@ -123,3 +123,47 @@ def _transform_dataset_direction():
     vp = VyperPoints()
     vp.transform_points((6319, 'ellipse'), 5866, x, y, z=z, include_vdatum_uncertainty=False)
     assert vp.z == approx(-vdatum_answer['north_carolina']['z_mllw'], abs=0.002)
+
+
+def test_transform_dataset_chunked():
+    x = vdatum_answer['north_carolina']['x']
+    y = vdatum_answer['north_carolina']['y']
+    z = vdatum_answer['north_carolina']['z_nad83']
+    vp = VyperPoints()
+    vp.transform_points((6319, 'ellipse'), 'mllw', x, y, z=z, include_region_index=True)
+    vp_chunked = VyperPoints()
+    vp_chunked.transform_points((6319, 'ellipse'), 'mllw', x, y, z=z, include_region_index=True, chunk_size=2)
+
+    assert vp_chunked.z == approx(vp.z, abs=0.0001)
+    assert vp_chunked.unc == approx(vp.unc, abs=0.0001)
+    assert (vp_chunked.region_index == vp.region_index).all()
+
+
+def test_uniform_bin_index():
+    x = np.linspace(-76.31, -75.12, 1001)
+    xx, yy, x_range, y_range = sample_array(float(x.min()), float(x.max()), 35.0, 35.5, 0.0005)
+    assert (uniform_bin_index(x, x_range) == np.digitize(x, x_range) - 1).all()
+
+
+def test_export_to_csv(tmp_path, monkeypatch):
+    import vyperdatum.points
+    x = vdatum_answer['north_carolina']['x']
+    y = vdatum_answer['north_carolina']['y']
+    z = vdatum_answer['north_carolina']['z_nad83']
+    vp = VyperPoints()
+    vp.transform_points((6319, 'ellipse'), 'mllw', x, y, z=z, include_region_index=True)
+    # small chunks, so that the rows are written over more than one chunk
+    monkeypatch.setattr(vyperdatum.points, 'csv_chunk_size', 2)
+    output_file = os.path.join(tmp_path, 'points.csv')
+    vp.export_to_csv(output_file)
+
+    # one row per point with columns x, y, z, uncertainty, region index
+    data = np.loadtxt(output_file)
+    assert data.shape == (len(x), 5)
+    assert (data[:, 0] == vp.x).all()
+    assert (data[:, 1] == vp.y).all()
+    assert (data[:, 2] == vp.z).all()
+    assert (data[:, 3] == vp.unc).all()
+    assert (data[:, 4] == vp.region_index).all()
+    with open(output_file) as ofile:
+        assert ofile.readline().split()[4] == str(vp.region_index[0])
@@ -97,6 +97,21 @@ def test_raster_data():
     assert cont_layer[400][400] == 396.0
     
 
+def test_raster_layers_load_on_access():
+    loaded = []
+
+    def load_band(idx):
+        loaded.append(idx)
+        return np.full((2, 2), idx, dtype=np.float32)
+
+    layers = RasterLayers([np.zeros((2, 2)), None, None], load_band)
+    assert not loaded
+    assert (layers[2] == 2).all()
+    assert (layers[-2] == 1).all()
+    assert [lyr[0][0] for lyr in layers] == [0, 1, 2]
+    assert loaded == [2, 1]
+
+
 def test_raster_datum_sep():
     vr = VyperRaster(test_file)
     vr.set_input_datum('ellipse')
@@ -368,6 +368,13 @@ def test_crs_is_compound():
     assert crs_is_compound(CRS.from_wkt(compound_wkt))
 
 
+def test_get_cached_crs():
+    assert get_cached_crs(6318) == CRS.from_epsg(6318)
+    assert get_cached_crs(6318) is get_cached_crs(6318)
+    wkt = CRS.from_epsg(5866).to_wkt()
+    assert get_cached_crs(wkt) == CRS.from_wkt(wkt)
+
+
 def test_pipeline_retrieval():
     cs = VyperPipelineCRS(gvc.datum_data)
     region_name = gvc.datum_data.regions[0]
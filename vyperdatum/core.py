@@ -1,4 +1,6 @@
-import os, sys, glob, configparser, hashlib
+import os, sys, configparser, hashlib, json, tempfile
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
 import numpy as np
 import pyproj.exceptions
@@ -6,7 +8,6 @@ from pyproj import Transformer, datadir, CRS
 from osgeo import gdal, ogr
 from typing import Any, Union
 import logging
-from datetime import datetime
 
 from vyperdatum.vypercrs import VyperPipelineCRS, get_transformation_pipeline, geoid_frame_lookup, geoid_possibilities, \
     frame_to_3dcrs
@@ -45,6 +46,7 @@ class VyperCore:
         self._regions = []
         self._geoid_frame = []
         self.pipelines = []
+        self._output_uncertainty = {}  # (input datum, output datum, output pipeline, region) to region uncertainty
 
     @property
     def regions(self):
@@ -75,10 +77,12 @@ class VyperCore:
             self.logger.debug(msg)
 
     def close(self):
-        # we want this to wait till all handlers are closed, it seems like you have to make multiple passes sometimes
-        # maybe a waiting for threads to terminate thing
-        while self.logger.handlers:
-            for handler in self.logger.handlers:
+        # iterate over a copy of the handlers, removing handlers from the list we are iterating over skips every other one
+        if self.logger is not None:
+            shared_handlers = _console_handlers()
+            for handler in list(self.logger.handlers):
+                if handler in shared_handlers:  # console handlers are shared with other VyperCore loggers, leave them
+                    continue
                 handler.close()
                 self.logger.removeHandler(handler)
         self.logger = None
@@ -118,41 +122,29 @@ class VyperCore:
         ring.AddPoint(ul[0], ul[1])
         data_geometry = ogr.Geometry(ogr.wkbPolygon)
         data_geometry.AddGeometry(ring)
+        # the same rectangle is tested against every polygon, prepare it once if the bindings support it
+        if hasattr(data_geometry, 'CreatePreparedGeometry'):
+            data_geometry = data_geometry.CreatePreparedGeometry()
+        bounds = (x_min, y_min, x_max, y_max)
 
         # see if the regions intersect with the provided geometries
         intersecting_regions = []
         self._geoid_frame = []
-        for region in self.datum_data.polygon_files:
-            vector = ogr.Open(self.datum_data.polygon_files[region])
-            layer_count = vector.GetLayerCount()
+        # only check the regions whose polygon file envelope overlaps the bounds
+        for region in self.datum_data.get_regions_in_envelope(x_min, y_min, x_max, y_max):
+            first_poly = self.datum_data.get_region_geometries(region)[1]
             found = False
-            for m in range(layer_count):
-                layer = vector.GetLayerByIndex(m)
-                feature_count = layer.GetFeatureCount()
-                for n in range(feature_count):
-                    feature = layer.GetNextFeature()
-                    try:
-                        feature_name = feature.GetField(0)
-                    except AttributeError:
-                        print('WARNING: Unable to read feature name from feature in layer in {}'.format(self.datum_data.polygon_files[region]))
-                        continue
-                    if isinstance(feature_name, str):
-                        if feature_name[:15] == 'valid-transform':
-                            valid_vdatum_poly = feature.GetGeometryRef()
-                            if data_geometry.Intersect(valid_vdatum_poly):
-                                intersecting_regions.append(region)
-                                gframe = self.datum_data.get_geoid_frame(region)
-                                self._geoid_frame.append(gframe)
-                                found = True
-                    feature = None
-                layer = None
-            if not found and region in self.datum_data.extended_region:
-                feature = vector.GetLayerByIndex(0).GetFeature(0)
-                if data_geometry.Intersect(feature.GetGeometryRef()):
+            for valid_vdatum_poly in self.datum_data.get_region_polygons_in_envelope(region, x_min, y_min, x_max, y_max):
+                if geometry_intersects_bounds(data_geometry, bounds, valid_vdatum_poly):
+                    intersecting_regions.append(region)
+                    gframe = self.datum_data.get_geoid_frame(region)
+                    self._geoid_frame.append(gframe)
+                    found = True
+            if not found and first_poly is not None and region in self.datum_data.extended_region:
+                if geometry_intersects_bounds(data_geometry, bounds, first_poly):
                     intersecting_regions.append(region)
                     gframe = self.datum_data.get_geoid_frame(region)
                     self._geoid_frame.append(gframe)
-            vector = None
         self._regions = intersecting_regions
         self.in_crs.update_regions(intersecting_regions)
         self.out_crs.update_regions(intersecting_regions)
@@ -227,22 +219,28 @@ class VyperCore:
             height value of the input data, transformed to NAD83(2011)
         """
 
-        in_crs = self.in_crs.horizontal.to_epsg()
+        frame_name = None
         if override_frame:
             if isinstance(override_frame, str):
+                frame_name = override_frame
                 out_crs = frame_to_3dcrs[override_frame]
             else:
-                out_crs = CRS.from_epsg(override_frame)
+                out_crs = override_frame
         else:  # the geoid frame attribute is the 2d coord system for each region, if override not specified, just use the first region frame
-            out_crs = frame_to_3dcrs[self._geoid_frame[0]]
-        # Transformer.transform input order is based on the CRS, see CRS.geodetic_crs.axis_info
-        # - lon, lat - this appears to be valid when using CRS from proj4 string
-        # - lat, lon - this appears to be valid when using CRS from epsg
-        # use the always_xy option to force the transform to expect lon/lat order
-        transformer = Transformer.from_crs(in_crs, out_crs, always_xy=True)
+            frame_name = self._geoid_frame[0]
+            out_crs = frame_to_3dcrs[frame_name]
 
         if z is None:
             z = np.zeros_like(x)
+        # the 2d and 3d geographic crs for a frame share the frame name, the transform between them would be a no-op
+        if frame_name is not None and self.in_crs.horizontal.name == frame_name:
+            return x, y, z
+        in_crs = self.in_crs.horizontal.to_epsg()
+        if in_crs == out_crs:  # already in the frame, the transform would be a no-op
+            return x, y, z
+        transformer = get_crs_transformer(in_crs, out_crs)
+        if transformer.definition.startswith('proj=noop'):  # ex: 2d and 3d crs of the same frame, skip the copy
+            return x, y, z
         x, y, z = transformer.transform(x, y, z)
 
         return x, y, z
@@ -262,6 +260,7 @@ class VyperCore:
         """
 
         self.in_crs.set_crs(input_datum)
+        self._output_uncertainty = {}
         if extents:
             self._set_extents(extents)
             self._set_region_by_extents()
@@ -279,8 +278,9 @@ class VyperCore:
             See vypercrs.VyperPipelineCRS and pipeline.datum_definition for possible options for string
         """
         self.out_crs.set_crs(output_datum)
+        self._output_uncertainty = {}
 
-    def _run_pipeline(self, x, y, pipeline, z=None):
+    def _run_pipeline(self, x, y, pipeline, z=None, inplace: bool = False):
         """
         Helper method for running the transformer pipeline operation on the provided data.
 
@@ -294,6 +294,9 @@ class VyperCore:
             string containing the pipeline information
         z
             optional, height value of the input data, if not provided will use all zeros
+        inplace
+            if True, the transformed values are written to the provided x, y, z arrays instead of new arrays.  Only use
+            with contiguous float64 arrays that we own.
 
         Returns
         -------
@@ -306,10 +309,48 @@ class VyperCore:
         assert len(x) == len(y) and len(y) == len(z)
 
         # get the transform at the sparse points
-        transformer = Transformer.from_pipeline(pipeline)
-        result = transformer.transform(xx=x, yy=y, zz=z)
+        transformer = get_pipeline_transformer(pipeline)
+        result = transformer.transform(xx=x, yy=y, zz=z, inplace=inplace)
         return result
 
+    def _run_region_pipeline(self, region: str, pipeline: str, x: np.array, y: np.array, z: np.array):
+        """
+        Run the vertical pipeline for the region, only for the points that fall within the region envelope.  The points
+        outside the envelope are left as inf, the same as the points outside of the grid coverage.
+
+        Parameters
+        ----------
+        region
+            region name as string
+        pipeline
+            proj pipeline string for the region
+        x
+            longitude of the input data in the geoid frame
+        y
+            latitude of the input data in the geoid frame
+        z
+            height value of the input data
+
+        Returns
+        -------
+        tuple
+            tuple of transformed x, y, z
+        """
+
+        if self.geographic_min_x is not None and self.datum_data.envelope_contains_bounds(
+                region, self.geographic_min_x, self.geographic_min_y, self.geographic_max_x, self.geographic_max_y):
+            # the data extents are entirely within the region envelope, no need to check each point
+            return self._run_pipeline(x, y, pipeline, z=z)
+        in_region = self.datum_data.get_points_in_envelope(region, x, y)
+        if in_region is None or in_region.all():
+            return self._run_pipeline(x, y, pipeline, z=z)
+        new_z = np.full(len(z), np.inf)
+        if in_region.any():
+            # the masked arrays are new copies, so the pipeline can write to them in place
+            new_z[in_region] = self._run_pipeline(np.asarray(x)[in_region], np.asarray(y)[in_region], pipeline,
+                                                  z=np.asarray(z)[in_region], inplace=True)[2]
+        return x, y, new_z
+
     def _get_output_uncertainty(self, region: str):
         """
         Get the output uncertainty for each point by reading the vdatum_sigma.inf file and combining the uncertainties
@@ -333,15 +374,43 @@ class VyperCore:
 
         if not self.out_crs.pipeline_string:  # if nad83 is the output datum, no transformation is done
             return 0
-        final_uncertainty = 0
         outdatum = self.out_crs.vyperdatum_str
         indatum = self.in_crs.vyperdatum_str
+        # the uncertainty only depends on the datums and the region, reuse it across transform_dataset calls
+        unc_key = (indatum, outdatum, self.out_crs.pipeline_string, region)
+        if unc_key not in self._output_uncertainty:
+            self._output_uncertainty[unc_key] = self._build_output_uncertainty(indatum, outdatum, region)
+        return self._output_uncertainty[unc_key]
+
+    def _build_output_uncertainty(self, indatum: str, outdatum: str, region: str):
+        """
+        Combine the uncertainties that apply for this region, see _get_output_uncertainty
+
+        Parameters
+        ----------
+        indatum
+            vyperdatum string for the input datum
+        outdatum
+            vyperdatum string for the output datum
+        region
+            region name as string
+
+        Returns
+        -------
+        float
+            uncertainty associated with each transformed point
+        """
+
+        final_uncertainty = 0
         if indatum == 'ellipse' and outdatum != 'ellipse':  # include ellipse-geoid uncertainty
-            gd_index = np.where([self.out_crs.pipeline_string.find(gd) for gd in geoid_possibilities] != -1)[0]
-            if gd_index.size != 1:
-                self.log_error(f'Found {len(gd_index.size)} geoid possibilities in pipeline string', ValueError)
-            geoid = geoid_possibilities[gd_index[0]]
-            final_uncertainty += self.datum_data.uncertainties[geoid]
+            pipeline_string = self.out_crs.pipeline_string
+            geoids = [gd for gd in geoid_possibilities if pipeline_string.find(gd) != -1]
+            if len(geoids) != 1:
+                self.log_error(f'Found {len(geoids)} geoid possibilities in pipeline string: {geoids}', ValueError)
+            geoid = geoids[0]
+            if geoid not in self.datum_data.uncertainties:
+                self.log_warning(f'No uncertainty found for geoid {geoid} in the vdatum_sigma file, using 0')
+            final_uncertainty += self.datum_data.uncertainties.get(geoid, 0)
         if indatum in ['ellipse', 'geoid', 'navd88'] and outdatum not in ['ellipse', 'geoid', 'navd88']:  # include tss uncertainty
             final_uncertainty += self.datum_data.uncertainties[region]['tss']
         if outdatum not in ['ellipse', 'geoid', 'tss', 'navd88']:
@@ -355,7 +424,7 @@ class VyperCore:
         return final_uncertainty
 
     def transform_dataset(self, x: np.array, y: np.array, z: np.array = None, include_vdatum_uncertainty: bool = True,
-                          include_region_index: bool = False):
+                          include_region_index: bool = False, z_dtype: np.dtype = np.float64):
         """
         Transform all points provided here for each vdatum grid file that overlaps the overall extents of the input data.
 
@@ -373,18 +442,25 @@ class VyperCore:
             if True, will return the combined separation uncertainty for each point
         include_region_index
             if True, will return the integer index of the region used for each point
+        z_dtype
+            dtype of the returned z value, np.float32 is plenty for the rounded (mm) result and halves the z buffer
 
         Returns
         -------
         tuple
             contains: transformed x value (if EPSG code is provided, else original x value),
                       transformed y value (if EPSG code is provided, else original y value),
-                      transformed z value,
-                      combined uncertainty for each vdatum layer if include_vdatum_uncertainty, otherwise None,
+                      transformed z value (z_dtype),
+                      combined uncertainty (float32) for each vdatum layer if include_vdatum_uncertainty, otherwise None,
                       region index for each vdatum layer if include_region_index, otherwise None
         """
+        # pyproj works on contiguous float64 arrays, convert once here instead of pyproj copying for each region
+        x = np.ascontiguousarray(x, dtype=np.float64)
+        y = np.ascontiguousarray(y, dtype=np.float64)
+        if z is not None:
+            z = np.ascontiguousarray(z, dtype=np.float64)
         if not self.min_x:
-            extents = (min(x), min(y), max(x), max(y))
+            extents = (float(np.nanmin(x)), float(np.nanmin(y)), float(np.nanmax(x)), float(np.nanmax(y)))
             self._set_extents(extents)
         if len(self._regions) == 0:
             self._set_region_by_extents()
@@ -395,8 +471,7 @@ class VyperCore:
                 self.log_error('Output datum insufficently specified', ValueError)
 
             if z is not None and not self.in_crs.is_height:
-                z = z.copy()  # do not alter the array input
-                z *= -1
+                z = np.negative(z)  # new array, do not alter the array input
             if self.out_crs.is_height:
                 flip = 1
             else:
@@ -406,9 +481,10 @@ class VyperCore:
             ans_y = np.full_like(y, np.nan)
             if z is None:
                 z = np.zeros(len(x))
-            ans_z = np.full_like(z, np.nan)
+            ans_z = np.full(z.shape, np.nan, dtype=z_dtype)
             if include_vdatum_uncertainty:
-                ans_unc = np.full_like(z, np.nan)
+                # uncertainties are centimeter level values from the sigma file, float32 is plenty
+                ans_unc = np.full(z.shape, np.nan, dtype=np.float32)
             else:
                 ans_unc = None
             if include_region_index:
@@ -418,13 +494,20 @@ class VyperCore:
 
             self.pipelines = []
             valid_regions = []
+            in_horiz_name = self.in_crs.horizontal.name
+            out_horiz_name = self.out_crs.horizontal.name
+            geoid_frame_xyz = {}  # points in each geoid frame, the regions generally share the same frame
+            out_frame_xyz = None
+            valid_index = np.empty(len(z), dtype=bool)  # reused for each region
+            # build the pipeline and geoid frame points for each region first, so that the pipelines can run together
+            region_jobs = []
             for cnt, region in enumerate(self._regions):
                 gframe = self.datum_data.get_geoid_frame(region)
                 geoid_name = self.datum_data.get_geoid_name(region)
-                in_horiz_name = self.in_crs.horizontal.name
-                out_horiz_name = self.out_crs.horizontal.name
                 if in_horiz_name != gframe:  # need to transform these points to use the geoid coordinate system
-                    new_x, new_y, new_z = self._transform_to_geoid_frame(x, y, z, override_frame=gframe)
+                    if gframe not in geoid_frame_xyz:
+                        geoid_frame_xyz[gframe] = self._transform_to_geoid_frame(x, y, z, override_frame=gframe)
+                    new_x, new_y, new_z = geoid_frame_xyz[gframe]
                 else:
                     new_x, new_y, new_z = x, y, z
                 pipeline, valid_pipeline = get_transformation_pipeline(self.in_crs, self.out_crs, region, geoid_name)
@@ -432,38 +515,219 @@ class VyperCore:
                     self.log_info(f'Pipeline "{pipeline}" for transformation from "{self.in_crs.pipeline_string}" to "{self.out_crs.pipeline_string}" in region "{region}" was flagged as invalid.  Missing support files?')
                     continue
                 elif pipeline:  # do the vertical transformation if there is a valid one for this operation
-                    new_x, new_y, new_z = self._run_pipeline(new_x, new_y, pipeline, z=new_z)
                     self.pipelines.append(pipeline)
                     valid_regions.append(region)
+                region_jobs.append((cnt, region, gframe, pipeline, new_x, new_y, new_z))
+
+            # pyproj releases the GIL while transforming, so the regions can run in parallel threads
+            pipeline_jobs = [job for job in region_jobs if job[3]]
+            for job in pipeline_jobs:
+                prefetch_pipeline_grids(job[3], self.datum_data.vdatum_path)
+            if len(pipeline_jobs) > 1:
+                with ThreadPoolExecutor(max_workers=min(len(pipeline_jobs), os.cpu_count() or 1)) as executor:
+                    pipeline_results = list(executor.map(lambda job: self._run_region_pipeline(job[1], *job[3:]), pipeline_jobs))
+            else:
+                pipeline_results = [self._run_region_pipeline(job[1], *job[3:]) for job in pipeline_jobs]
+            pipeline_results = dict(zip([job[0] for job in pipeline_jobs], pipeline_results))
+
+            if include_vdatum_uncertainty:
+                unc_by_region = {job[1]: self._get_output_uncertainty(job[1]) for job in region_jobs}
+            # merge the results in region order, later regions overwrite earlier ones where they overlap
+            for cnt, region, gframe, pipeline, new_x, new_y, new_z in region_jobs:
+                if pipeline:
+                    new_x, new_y, new_z = pipeline_results[cnt]
                 if out_horiz_name == in_horiz_name:  # we can use the original xy as the input/output horiz datums are the same
                     new_x, new_y = x, y
                 elif out_horiz_name == gframe:  # we can use the transformed geoid frame xy as the output and gframe datums are the same
                     new_x, new_y = new_x, new_y
                 else:  # we need to get new xyz to account for the change in datum
-                    new_x, new_y, diffz = self._transform_to_geoid_frame(x, y, z, override_frame=self.out_crs.horizontal.to_epsg())
-                    new_z = new_z - (z - diffz)
+                    if out_frame_xyz is None:  # same for every region, transform once and keep the z change
+                        out_x, out_y, diffz = self._transform_to_geoid_frame(x, y, z, override_frame=self.out_crs.horizontal.to_epsg())
+                        if diffz is z:  # no-op transform, no change in z
+                            diffz = np.zeros_like(z)
+                        else:  # diffz is a new array from the transformer, reuse it for the change in z
+                            np.subtract(z, diffz, out=diffz)
+                        out_frame_xyz = (out_x, out_y, diffz)
+                    new_x, new_y, z_change = out_frame_xyz
+                    new_z = new_z - z_change
                 # areas outside the coverage of the vert shift are inf
-                valid_index = ~np.isinf(new_z)
-                ans_x[valid_index] = new_x[valid_index]
-                ans_y[valid_index] = new_y[valid_index]
-                ans_z[valid_index] = flip * new_z[valid_index]
-                if include_vdatum_uncertainty:
-                    ans_unc[valid_index] = self._get_output_uncertainty(region)
-                if include_region_index:
-                    ans_region[valid_index] = cnt
+                np.isinf(new_z, out=valid_index)
+                np.logical_not(valid_index, out=valid_index)
+                region_unc = unc_by_region[region] if include_vdatum_uncertainty else None
+                apply_region_result(valid_index, flip, new_x, new_y, new_z, region_unc, cnt, ans_x, ans_y, ans_z,
+                                    ans_unc, ans_region)
             # update the regions to those that passed
             if len(valid_regions) > 0:
+                if ans_region is not None and valid_regions != self._regions:
+                    # the region index should point at the regions we keep, so that it stays the same for later calls
+                    region_lookup = np.array([valid_regions.index(rg) if rg in valid_regions else -1 for rg in self._regions],
+                                             dtype=ans_region.dtype)
+                    has_region = ans_region >= 0
+                    ans_region[has_region] = region_lookup[ans_region[has_region]]
                 self._regions = valid_regions
                 self.in_crs.update_regions(valid_regions)
                 self.out_crs.update_regions(valid_regions)
                 self.log_info(f'transformed {len(ans_z)} points from {self.in_crs.vyperdatum_str} to {self.out_crs.vyperdatum_str}')
             else:
                 self.log_error('No valid region found with the specified datum transformation. Unable to perform transformation', ValueError)
-            return ans_x, ans_y, np.round(ans_z, 3), ans_unc, ans_region
+            np.round(ans_z, 3, out=ans_z)  # ans_z is our own buffer, round in place
+            return ans_x, ans_y, ans_z, ans_unc, ans_region
         else:
             self.log_error('No regions specified, unable to transform points', ValueError)
 
 
+def apply_region_result(valid_index: np.array, flip: int, new_x: np.array, new_y: np.array, new_z: np.array,
+                        region_unc: float, region_index: int, ans_x: np.array, ans_y: np.array, ans_z: np.array,
+                        ans_unc: np.array = None, ans_region: np.array = None):
+    """
+    Write the transformed points for one region into the answer arrays, only where valid_index is True.  When every
+    point is valid (the common case for a single region) we skip the masked writes entirely.
+
+    Parameters
+    ----------
+    valid_index
+        boolean mask of the points that this region transformed
+    flip
+        1 if the output is height, -1 if the output is depth
+    new_x
+        transformed x for this region
+    new_y
+        transformed y for this region
+    new_z
+        transformed z for this region, as height
+    region_unc
+        uncertainty for this region, only used if ans_unc is provided
+    region_index
+        index of the region, only used if ans_region is provided
+    ans_x
+        answer x array, modified in place
+    ans_y
+        answer y array, modified in place
+    ans_z
+        answer z array, modified in place
+    ans_unc
+        optional, answer uncertainty array, modified in place
+    ans_region
+        optional, answer region index array, modified in place
+    """
+
+    if valid_index.all():
+        ans_x[:] = new_x
+        ans_y[:] = new_y
+        np.multiply(new_z, flip, out=ans_z)
+        if ans_unc is not None:
+            ans_unc[:] = region_unc
+        if ans_region is not None:
+            ans_region[:] = region_index
+    elif valid_index.any():
+        np.copyto(ans_x, new_x, where=valid_index)
+        np.copyto(ans_y, new_y, where=valid_index)
+        np.multiply(new_z, flip, out=ans_z, where=valid_index)
+        if ans_unc is not None:
+            np.copyto(ans_unc, region_unc, where=valid_index)
+        if ans_region is not None:
+            np.copyto(ans_region, region_index, where=valid_index)
+
+
+def get_crs_transformer(in_crs: Union[int, CRS], out_crs: Union[int, CRS]):
+    """
+    Return the Transformer from in_crs to out_crs.  Building a Transformer is expensive, so these are cached and reused
+    across VyperCore instances.  PROJ finds the grid files when the Transformer is built, so the cache is also keyed on
+    the PROJ data directories.  See clear_transformer_cache.
+
+    Parameters
+    ----------
+    in_crs
+        source crs as either an epsg code or a pyproj CRS
+    out_crs
+        destination crs as either an epsg code or a pyproj CRS
+
+    Returns
+    -------
+    Transformer
+        pyproj Transformer from in_crs to out_crs, always using lon/lat order
+    """
+
+    return _get_crs_transformer(in_crs, out_crs, datadir.get_data_dir())
+
+
+@lru_cache(maxsize=256)
+def _get_crs_transformer(in_crs: Union[int, CRS], out_crs: Union[int, CRS], data_dir: str):
+    """
+    Build the Transformer for get_crs_transformer, data_dir is only used as part of the cache key
+
+    Parameters
+    ----------
+    in_crs
+        source crs as either an epsg code or a pyproj CRS
+    out_crs
+        destination crs as either an epsg code or a pyproj CRS
+    data_dir
+        pyproj data directory string
+
+    Returns
+    -------
+    Transformer
+        pyproj Transformer from in_crs to out_crs, always using lon/lat order
+    """
+
+    # Transformer.transform input order is based on the CRS, see CRS.geodetic_crs.axis_info
+    # - lon, lat - this appears to be valid when using CRS from proj4 string
+    # - lat, lon - this appears to be valid when using CRS from epsg
+    # use the always_xy option to force the transform to expect lon/lat order
+    return Transformer.from_crs(in_crs, out_crs, always_xy=True)
+
+
+def get_pipeline_transformer(pipeline: str):
+    """
+    Return the Transformer for the given PROJ pipeline string.  The pipeline uses grid paths relative to the PROJ data
+    directories, so the cache is keyed on the pipeline and the data directories, see get_crs_transformer.
+
+    Parameters
+    ----------
+    pipeline
+        string containing the pipeline information
+
+    Returns
+    -------
+    Transformer
+        pyproj Transformer for the pipeline
+    """
+
+    return _get_pipeline_transformer(pipeline, datadir.get_data_dir())
+
+
+@lru_cache(maxsize=256)
+def _get_pipeline_transformer(pipeline: str, data_dir: str):
+    """
+    Build the Transformer for get_pipeline_transformer, data_dir is only used as part of the cache key
+
+    Parameters
+    ----------
+    pipeline
+        string containing the pipeline information
+    data_dir
+        pyproj data directory string
+
+    Returns
+    -------
+    Transformer
+        pyproj Transformer for the pipeline
+    """
+
+    return Transformer.from_pipeline(pipeline)
+
+
+def clear_transformer_cache():
+    """
+    Clear the cached Transformer objects.  Run this in new processes (if forked), so that the transformers are rebuilt.
+    Changing the PROJ data directories does not require this, the cache is keyed on the data directories.
+    """
+
+    _get_crs_transformer.cache_clear()
+    _get_pipeline_transformer.cache_clear()
+
+
 class DatumData:
     """
     Gets and maintains datum information for use with Vyperdatum.
@@ -485,6 +749,11 @@ class DatumData:
         self.vdatum_version = ''
         self.extended_region = {}  # dict of region to custom region data from the custom region's config file
         self.extended_region_lookup = {}  # dict of extended region path to list of regions associated with that path
+        self.polygon_envelopes = {}  # dict of polygon file path to the (min x, max x, min y, max y) of that file
+        self.polygon_geometries = {}  # dict of polygon file path to the geometries read from that file
+        self.polygon_geometry_envelopes = {}  # dict of polygon file path to (N, 4) array of the geometry envelopes
+        self._geoid_names = {}  # dict of (region, vdatum version) to geoid name, see get_geoid_name
+        self._geoid_frames = {}  # dict of (region, vdatum version) to geoid frame, see get_geoid_frame
 
         self._config = {'vdatum_path': ''}  # dict of all the settings
         self.config_path_file = ''  # path to the config file that maintains the settings between runs
@@ -497,6 +766,39 @@ class DatumData:
         self.get_vdatum_version()
         self.set_other_paths(self._config)
 
+    def _log_info(self, msg: str):
+        """
+        Log to the parent VyperCore logger, or print if the parent logger is not initialized yet.  DatumData is built
+        before the VyperCore logger, so messages during initialization go to print.
+
+        Parameters
+        ----------
+        msg
+            message to log
+        """
+
+        logger = getattr(self.parent, 'logger', None)
+        if logger is not None:
+            self.parent.log_info(msg)
+        elif self.parent:
+            print(msg)
+
+    def _log_warning(self, msg: str):
+        """
+        Warning version of _log_info, see _log_info
+
+        Parameters
+        ----------
+        msg
+            message to log
+        """
+
+        logger = getattr(self.parent, 'logger', None)
+        if logger is not None:
+            self.parent.log_warning(msg)
+        elif self.parent:
+            print(f'WARNING: {msg}')
+
     def set_config(self, ky: str, value: Any):
         """
         Setter for the _config attribute.  Use this instead of setting _config directly, will set both the _config
@@ -510,23 +812,11 @@ class DatumData:
             value to set in the dict
         """
 
-        try:
-            config = configparser.ConfigParser()
-            config.read(self.config_path_file)
-            for k, v in self._config.items():
-                config['Default'][k] = v
-
+        # _config is loaded from the ini file on initialization, only write it back if the value actually changes
+        if self._config.get(ky) != value:
             self._config[ky] = value  # set the class attribute
-            config['Default'][ky] = value  # set the ini matching attribute
-            with open(self.config_path_file, 'w') as configfile:
-                config.write(configfile)
-        except:
-            # get a number of exceptions here when reading and writing to the config file in multiprocessing
-            try:
-                if self.parent:
-                    self.parent.log_warning('Unable to set {} in config file {}'.format(ky, self.config_path_file))
-            except AttributeError:  # logger not initialized yet
-                print('WARNING: Unable to set {} in config file {}'.format(ky, self.config_path_file))
+            if not self._write_config_file():
+                self._log_warning('Unable to set {} in config file {}'.format(ky, self.config_path_file))
         if ky == 'vdatum_path':
             self.vdatum_path = value
 
@@ -541,25 +831,30 @@ class DatumData:
             key to remove from the dict
         """
 
+        if ky in self._config:
+            self._config.pop(ky)
+            if not self._write_config_file():
+                self._log_warning('Unable to remove {} from config file {}'.format(ky, self.config_path_file))
+
+    def _write_config_file(self):
+        """
+        Write the _config attribute to the ini file.  _config holds the current settings, so the file is not read first.
+
+        Returns
+        -------
+        bool
+            True if the file was written
+        """
+
         try:
             config = configparser.ConfigParser()
-            config.read(self.config_path_file)
-            for k, v in self._config.items():
-                config['Default'][k] = v
-
-            if ky in self._config:
-                self._config.pop(ky)
-            if ky in config['Default']:
-                config['Default'].pop(ky)
-                with open(self.config_path_file, 'w') as configfile:
-                    config.write(configfile)
+            config['Default'] = self._config
+            with open(self.config_path_file, 'w') as configfile:
+                config.write(configfile)
         except:
             # get a number of exceptions here when reading and writing to the config file in multiprocessing
-            try:
-                if self.parent:
-                    self.parent.log_warning('Unable to remove {} from config file {}'.format(ky, self.config_path_file))
-            except AttributeError:  # logger not initialized yet
-                print('WARNING: Unable to remove {} from config file {}'.format(ky, self.config_path_file))
+            return False
+        return True
 
     def _get_stored_vdatum_config(self):
         """
@@ -577,11 +872,7 @@ class DatumData:
             self.vdatum_path = self._config['vdatum_path']
         except:
             # get a number of exceptions here when reading and writing to the config file in multiprocessing
-            try:
-                if self.parent:
-                    self.parent.log_warning('Unable to get stored vdatum config file {}'.format(self.config_path_file))
-            except AttributeError:  # logger not initialized yet
-                print('WARNING: Unable to get stored vdatum config file {}'.format(self.config_path_file))
+            self._log_warning('Unable to get stored vdatum config file {}'.format(self.config_path_file))
             
     def _read_from_config_file(self):
         """
@@ -604,11 +895,7 @@ class DatumData:
                     settings[key] = config_file_section[key]
         except:
             # get a number of exceptions here when reading and writing to the config file in multiprocessing
-            try:
-                if self.parent:
-                    self.parent.log_warning('Unable to read from existing config file {}'.format(self.config_path_file))
-            except AttributeError:  # logger not initialized yet
-                print('WARNING: Unable to read from existing config file {}'.format(self.config_path_file))
+            self._log_warning('Unable to read from existing config file {}'.format(self.config_path_file))
         # ensure a vdatum path attribute is in the settings to make the rest of the code work
         if 'vdatum_path' not in settings:
             settings['vdatum_path'] = ''
@@ -639,11 +926,7 @@ class DatumData:
                 config.write(configfile)
         except:
             # get a number of exceptions here when reading and writing to the config file in multiprocessing
-            try:
-                if self.parent:
-                    self.parent.log_warning('Unable to create new config file {}'.format(self.config_path_file))
-            except AttributeError:  # logger not initialized yet
-                print('WARNING: Unable to create new config file {}'.format(self.config_path_file))
+            self._log_warning('Unable to create new config file {}'.format(self.config_path_file))
         return default_settings
 
     def set_vdatum_directory(self, vdatum_path: str):
@@ -662,12 +945,26 @@ class DatumData:
             datadir.append_data_dir(vdatum_path)
     
         # also want to populate grids and polygons with what we find
-        self.grid_files, self.regions = get_grid_list(vdatum_path)
-        self.polygon_files = get_region_polygons(vdatum_path)
-        self.uncertainties = get_vdatum_uncertainties(vdatum_path)
+        # scan the region subfolders once, and use that file list for the grids, polygons and uncertainties
+        file_list = scan_datum_directory(vdatum_path)
+        self.grid_files, self.regions = get_grid_list(vdatum_path, file_list=file_list)
+        self.polygon_files = get_region_polygons(vdatum_path, file_list=file_list)
+        self.uncertainties = get_vdatum_uncertainties(vdatum_path, file_list=file_list)
+        self._clear_region_caches()
 
         self.vdatum_path = self._config['vdatum_path']
 
+    def _clear_region_caches(self):
+        """
+        Clear the values stored per region, run whenever the regions or their uncertainties are reloaded.  This includes
+        the output uncertainty stored on the parent VyperCore, see VyperCore._get_output_uncertainty.
+        """
+
+        self._geoid_names = {}
+        self._geoid_frames = {}
+        if self.parent is not None:
+            self.parent._output_uncertainty = {}
+
     def set_external_region_directory(self, external_path: str, external_key: str = 'external_path'):
         """
         Set a new external region directory, a directory that can hold custom region files that are outside the base vdatum
@@ -684,11 +981,7 @@ class DatumData:
         assert external_key.endswith('_path')
         self.set_config(external_key, external_path)
         self.set_other_paths({external_key: external_path})
-        try:
-            if self.parent:
-                self.parent.log_info(f'Added {len(self.extended_region_lookup[external_key])} new region(s) from {external_path}')
-        except AttributeError:  # logger not initialized yet
-            print(f'Added {len(self.extended_region_lookup[external_key])} new regions from {external_path}')
+        self._log_info(f'Added {len(self.extended_region_lookup[external_key])} new region(s) from {external_path}')
 
     def remove_external_region_directory(self, external_key: str):
         """
@@ -713,11 +1006,8 @@ class DatumData:
                 self.extended_region.pop(region)
                 if region in self.uncertainties:
                     self.uncertainties.pop(region)
-            try:
-                if self.parent:
-                    self.parent.log_info(f'Removed {num_regions} region(s) associated with {external_key}')
-            except AttributeError:  # logger not initialized yet
-                print(f'Removed {num_regions} region(s) associated with {external_key}')
+            self._clear_region_caches()
+            self._log_info(f'Removed {num_regions} region(s) associated with {external_key}')
 
     def set_other_paths(self, config: dict):
         """
@@ -725,43 +1015,233 @@ class DatumData:
         """
 
         self.extended_region = {}
-        orig_proj_paths = datadir.get_data_dir()
-        for entry in config.keys():
-            if entry.endswith('_path') and entry != 'vdatum_path':
-                new_path = config[entry]
-                if os.path.exists(new_path):
-                    if new_path not in orig_proj_paths:
-                        datadir.append_data_dir(new_path)
-                    other_grids, other_regions = get_grid_list(new_path)
-                    self.extended_region_lookup[entry] = []
-                    for region in other_regions:
-                        valid_region = False
-                        valid_exts = ['.gpkg', '.shp', '.kml']
-                        polygon_file = [os.path.join(new_path,region,region + vext) for vext in valid_exts]
-                        polygon_file = [pf for pf in polygon_file if os.path.exists(pf)]
-                        if polygon_file:
-                            polygon_file = polygon_file[0]
-                        else:
-                            print(f'Unable to find polygon file for region {region} using one of these extensions: {valid_exts}')
-                            continue
-                        if os.path.exists(polygon_file):
-                            config_path = os.path.join(new_path,region,region + '.config')
-                            if os.path.exists(polygon_file):
-                                new_region_info = read_regional_config(config_path)
-                                if 'reference_frame' in new_region_info and 'reference_geoid' in new_region_info:
-                                    valid_region = True
-                        if valid_region:
-                            self.extended_region_lookup[entry].append(region)
-                            if region in self.regions:  # ensure the region is only added once
-                                self.regions.remove(region)
-                            self.regions.append(region)
-                            self.polygon_files[region] = polygon_file
-                            self.extended_region[region] = new_region_info
-                            self.uncertainties[region] = {}
-                            for ky in new_region_info:
-                                if ky.startswith('uncertainty_'):
-                                    _, datumky = ky.split('_')
-                                    self.uncertainties[region][datumky] = new_region_info[ky]
+        self._clear_region_caches()
+        path_keys = [ky for ky in config if ky.endswith('_path') and ky != 'vdatum_path']
+        if not path_keys:
+            return
+        orig_proj_paths = set(datadir.get_data_dir().split(os.pathsep))
+        for entry in path_keys:
+            new_path = config[entry]
+            if os.path.exists(new_path):
+                if new_path not in orig_proj_paths:
+                    datadir.append_data_dir(new_path)
+                    orig_proj_paths.add(new_path)
+                other_grids, other_regions = get_grid_list(new_path)
+                self.extended_region_lookup[entry] = []
+                for region in other_regions:
+                    valid_exts = ['.gpkg', '.shp', '.kml']
+                    polygon_file = [os.path.join(new_path, region, region + vext) for vext in valid_exts]
+                    polygon_file = [pf for pf in polygon_file if os.path.exists(pf)]
+                    if polygon_file:
+                        polygon_file = polygon_file[0]
+                    else:
+                        self._log_warning(f'Unable to find polygon file for region {region} using one of these extensions: {valid_exts}')
+                        continue
+                    config_path = os.path.join(new_path, region, region + '.config')
+                    if not os.path.exists(config_path):
+                        self._log_warning(f'Unable to find config file for region {region}: {config_path}')
+                        continue
+                    new_region_info = read_regional_config(config_path)
+                    if 'reference_frame' not in new_region_info or 'reference_geoid' not in new_region_info:
+                        self._log_warning(f'Skipping region {region}, config file must contain reference_frame and reference_geoid entries: {config_path}')
+                        continue
+                    self.extended_region_lookup[entry].append(region)
+                    if region in self.regions:  # ensure the region is only added once
+                        self.regions.remove(region)
+                    self.regions.append(region)
+                    self.polygon_files[region] = polygon_file
+                    self.extended_region[region] = new_region_info
+                    self.uncertainties[region] = {}
+                    for ky in new_region_info:
+                        if ky.startswith('uncertainty_'):
+                            _, datumky = ky.split('_')
+                            self.uncertainties[region][datumky] = new_region_info[ky]
+
+    def get_region_envelope(self, region: str):
+        """
+        Return the envelope of the polygon file for the given region.  The polygon file is only read the first time,
+        after that the stored envelope is returned.
+
+        Parameters
+        ----------
+        region
+            region name, must be a key in polygon_files
+
+        Returns
+        -------
+        tuple
+            (min x, max x, min y, max y) for the region polygon file, None if it could not be read
+        """
+
+        polygon_file = self.polygon_files[region]
+        if polygon_file not in self.polygon_envelopes:
+            self._read_polygon_file(polygon_file)
+        return self.polygon_envelopes[polygon_file]
+
+    def get_points_in_envelope(self, region: str, x: np.array, y: np.array):
+        """
+        Return a boolean mask of the points that fall within the polygon file envelope for the given region.
+
+        Parameters
+        ----------
+        region
+            region name, must be a key in polygon_files
+        x
+            longitude of the points
+        y
+            latitude of the points
+
+        Returns
+        -------
+        np.array
+            boolean mask, True where the point is within the envelope.  None if the region has no envelope.
+        """
+
+        if region not in self.polygon_files:
+            return None
+        envelope = self.get_region_envelope(region)
+        if envelope is None:
+            return None
+        env_min_x, env_max_x, env_min_y, env_max_y = envelope
+        x = np.asarray(x)
+        y = np.asarray(y)
+        return (x >= env_min_x) & (x <= env_max_x) & (y >= env_min_y) & (y <= env_max_y)
+
+    def envelope_contains_bounds(self, region: str, x_min: float, y_min: float, x_max: float, y_max: float):
+        """
+        Check if the provided bounds are entirely within the polygon file envelope for the given region.
+
+        Parameters
+        ----------
+        region
+            region name, must be a key in polygon_files
+        x_min
+            the minimum longitude of the area of interest
+        y_min
+            the minimum latitude of the area of interest
+        x_max
+            the maximum longitude of the area of interest
+        y_max
+            the maximum latitude of the area of interest
+
+        Returns
+        -------
+        bool
+            True if the bounds are within the envelope, False if not or if the region has no envelope
+        """
+
+        if region not in self.polygon_files:
+            return False
+        envelope = self.get_region_envelope(region)
+        if envelope is None:
+            return False
+        env_min_x, env_max_x, env_min_y, env_max_y = envelope
+        return env_min_x <= x_min and x_max <= env_max_x and env_min_y <= y_min and y_max <= env_max_y
+
+    def get_regions_in_envelope(self, x_min: float, y_min: float, x_max: float, y_max: float):
+        """
+        Return the regions whose polygon file envelope overlaps the provided bounds.  The envelopes are read once per
+        polygon file and kept in polygon_envelopes, so this is a quick filter before doing the actual polygon
+        intersection.
+
+        Parameters
+        ----------
+        x_min
+            the minimum longitude of the area of interest
+        y_min
+            the minimum latitude of the area of interest
+        x_max
+            the maximum longitude of the area of interest
+        y_max
+            the maximum latitude of the area of interest
+
+        Returns
+        -------
+        list
+            list of region names, in the same order as polygon_files
+        """
+
+        candidates = []
+        for region in self.polygon_files:
+            envelope = self.get_region_envelope(region)
+            if envelope is None:
+                continue
+            env_min_x, env_max_x, env_min_y, env_max_y = envelope
+            if env_min_x <= x_max and env_max_x >= x_min and env_min_y <= y_max and env_max_y >= y_min:
+                candidates.append(region)
+        return candidates
+
+    def get_region_geometries(self, region: str):
+        """
+        Return the geometries read from the polygon file for the given region.  The polygon file is only read the first
+        time, after that the stored geometries are returned.
+
+        Parameters
+        ----------
+        region
+            region name, must be a key in polygon_files
+
+        Returns
+        -------
+        list
+            list of ogr geometries for the valid-transform features in the polygon file
+        ogr.Geometry
+            geometry of the first feature in the first layer, used for extended regions without valid-transform
+            features, None if the file has no features
+        """
+
+        polygon_file = self.polygon_files[region]
+        if polygon_file not in self.polygon_geometries:
+            self._read_polygon_file(polygon_file)
+        return self.polygon_geometries[polygon_file]
+
+    def _read_polygon_file(self, polygon_file: str):
+        """
+        Open the polygon file once and store both the file envelope and the geometries, see read_polygon_file.
+
+        Parameters
+        ----------
+        polygon_file
+            absolute file path to the region polygon file
+        """
+
+        envelope, valid_polys, first_poly = read_polygon_file(polygon_file)
+        self.polygon_envelopes[polygon_file] = envelope
+        self.polygon_geometries[polygon_file] = (valid_polys, first_poly)
+
+    def get_region_polygons_in_envelope(self, region: str, x_min: float, y_min: float, x_max: float, y_max: float):
+        """
+        Return the valid-transform geometries for the region whose envelope overlaps the provided bounds.  The geometry
+        envelopes are stored as an array per polygon file, so that the overlap test is done for all the geometries at
+        once and only the overlapping geometries need the full intersection test.
+
+        Parameters
+        ----------
+        region
+            region name, must be a key in polygon_files
+        x_min
+            the minimum longitude of the area of interest
+        y_min
+            the minimum latitude of the area of interest
+        x_max
+            the maximum longitude of the area of interest
+        y_max
+            the maximum latitude of the area of interest
+
+        Returns
+        -------
+        list
+            list of ogr geometries for the valid-transform features that overlap the bounds
+        """
+
+        valid_polys = self.get_region_geometries(region)[0]
+        polygon_file = self.polygon_files[region]
+        if polygon_file not in self.polygon_geometry_envelopes:
+            self.polygon_geometry_envelopes[polygon_file] = np.array([poly.GetEnvelope() for poly in valid_polys],
+                                                                     dtype=np.float64).reshape(-1, 4)
+        envelopes = self.polygon_geometry_envelopes[polygon_file]
+        overlaps = (envelopes[:, 0] <= x_max) & (envelopes[:, 1] >= x_min) & (envelopes[:, 2] <= y_max) & (envelopes[:, 3] >= y_min)
+        return [valid_polys[idx] for idx in np.flatnonzero(overlaps)]
 
     def get_vdatum_version(self):
         """
@@ -773,22 +1253,21 @@ class DatumData:
         if not os.path.exists(self.vdatum_path):
             raise ValueError(f'VDatum is not found at the provided path: {self.vdatum_path}')
         vyperversion_file = os.path.join(self.vdatum_path, 'vdatum_vyperversion.txt')
+        vversion = ''
         if os.path.exists(vyperversion_file):
             with open(vyperversion_file, 'r') as vfile:
-                vversion = vfile.read()
-        else:
-            try:
-                if self.parent:
-                    self.parent.log_info(f'Performing hash comparison to identify VDatum version, should only run once for a new VDatum directory...')
-            except AttributeError:  # logger not initialized yet
-                print(f'Performing hash comparison to identify VDatum version, should only run once for a new VDatum directory...')
+                vlines = vfile.read().splitlines()
+            if vlines:
+                vversion = vlines[0]
+            # second line is the grid manifest when the file was written, older version files will not have it
+            if len(vlines) > 1 and vlines[1] != return_vdatum_manifest(self.grid_files, self.vdatum_path):
+                self._log_info(f'VDatum grids have changed since {vyperversion_file} was generated')
+                vversion = ''
+        if not vversion:
+            self._log_info(f'Performing hash comparison to identify VDatum version, should only run once for a new VDatum directory...')
             vversion = return_vdatum_version(self.grid_files, self.vdatum_path, save_path=vyperversion_file)
             if vversion:
-                try:
-                    if self.parent:
-                        self.parent.log_info(f'Generated new version file: {vyperversion_file}')
-                except AttributeError:  # logger not initialized yet
-                    print(f'Generated new version file: {vyperversion_file}')
+                self._log_info(f'Generated new version file: {vyperversion_file}')
         self.vdatum_version = vversion
         
     def get_geoid_name(self, region_name: str, vdatum_version: str = None) -> str:
@@ -810,12 +1289,14 @@ class DatumData:
         
         if not vdatum_version:
             vdatum_version = self.vdatum_version
-        try:
-            geoid_name = vdatum_geoidlookup[vdatum_version][region_name]
-        except KeyError:
-            geoid_name = self.extended_region[region_name]['reference_geoid']
-        
-        return geoid_name
+        lookup_key = (region_name, vdatum_version)
+        if lookup_key not in self._geoid_names:
+            try:
+                geoid_name = vdatum_geoidlookup[vdatum_version][region_name]
+            except KeyError:
+                geoid_name = self.extended_region[region_name]['reference_geoid']
+            self._geoid_names[lookup_key] = geoid_name
+        return self._geoid_names[lookup_key]
     
     def get_geoid_frame(self, region_name: str, vdatum_version: str = None) -> str:
         """
@@ -836,15 +1317,72 @@ class DatumData:
 
         if not vdatum_version:
             vdatum_version = self.vdatum_version
+        lookup_key = (region_name, vdatum_version)
+        if lookup_key not in self._geoid_frames:
+            try:
+                geoid_frame = geoid_frame_lookup[vdatum_geoidlookup[vdatum_version][region_name]]
+            except KeyError:
+                geoid_frame = self.extended_region[region_name]['reference_frame']
+            self._geoid_frames[lookup_key] = geoid_frame
+        return self._geoid_frames[lookup_key]
+
+
+def scan_datum_directory(datums_directory: str) -> list:
+    """
+    List all the files in the subfolders of the datums directory, i.e. the files in each region folder.  A single
+    scandir pass that the grid and polygon searches can share, instead of globbing the directory for each extension.
+
+    Parameters
+    ----------
+    datums_directory
+        absolute folder path to the vdatum directory
+
+    Returns
+    -------
+    list
+        list of absolute file paths, in the same form as glob.glob(os.path.join(datums_directory, '*/*'))
+    """
+
+    file_list = []
+    try:
+        region_entries = list(os.scandir(datums_directory))
+    except OSError:
+        return file_list
+    for region_entry in region_entries:
+        # match glob, which skips hidden files and folders
+        if region_entry.name.startswith('.') or not region_entry.is_dir():
+            continue
         try:
-            geoid_frame = geoid_frame_lookup[vdatum_geoidlookup[vdatum_version][region_name]]
-        except KeyError:
-            geoid_frame = self.extended_region[region_name]['reference_frame']
+            file_entries = list(os.scandir(region_entry.path))
+        except OSError:
+            continue
+        file_list += [file_entry.path for file_entry in file_entries
+                      if not file_entry.name.startswith('.') and file_entry.is_file()]
+    return file_list
+
 
-        return geoid_frame
+def _filter_by_extension(file_list: list, extension: str) -> list:
+    """
+    Return the files in file_list that end with extension, using the same case rules as glob on this platform
 
+    Parameters
+    ----------
+    file_list
+        list of file paths
+    extension
+        file extension including the dot, ex: '.gtx'
 
-def get_grid_list(vdatum_directory: str):
+    Returns
+    -------
+    list
+        list of file paths with that extension
+    """
+
+    extension = os.path.normcase(extension)
+    return [fil for fil in file_list if os.path.normcase(fil).endswith(extension)]
+
+
+def get_grid_list(vdatum_directory: str, file_list: list = None):
     """
     Search the vdatum directory to find all gtx files
 
@@ -852,6 +1390,8 @@ def get_grid_list(vdatum_directory: str):
     ----------
     vdatum_directory
         absolute folder path to the vdatum directory
+    file_list
+        optional, result of scan_datum_directory for vdatum_directory, if not provided the directory is scanned here
 
     Returns
     -------
@@ -861,10 +1401,11 @@ def get_grid_list(vdatum_directory: str):
         list of vdatum regions
     """
 
+    if file_list is None:
+        file_list = scan_datum_directory(vdatum_directory)
     grid_list = []
     for gfmt in grid_formats:
-        search_path = os.path.join(vdatum_directory, '*/*{}'.format(gfmt))
-        grid_list += glob.glob(search_path)
+        grid_list += _filter_by_extension(file_list, gfmt)
     if len(grid_list) == 0:
         errmsg = f'No grid files found in the provided VDatum directory: {vdatum_directory}'
         print(errmsg)
@@ -874,14 +1415,14 @@ def get_grid_list(vdatum_directory: str):
         grd_path, grd_file = os.path.split(grd)
         grd_path, grd_folder = os.path.split(grd_path)
         gtx_name = '/'.join([grd_folder, grd_file])
-        gtx_subpath = os.path.join(grd_folder, grd_file)
+        gtx_subpath = f'{grd_folder}{os.sep}{grd_file}'
         grids[gtx_name] = gtx_subpath
         regions.append(grd_folder)
     regions = list(set(regions))
     return grids, regions
 
 
-def get_region_polygons(datums_directory: str, extension: str = 'kml') -> dict:
+def get_region_polygons(datums_directory: str, extension: str = 'kml', file_list: list = None) -> dict:
     """"
     Search the datums directory to find all geometry files.  All datums are assumed to reside in a subfolder.
 
@@ -892,6 +1433,8 @@ def get_region_polygons(datums_directory: str, extension: str = 'kml') -> dict:
         
     extension : str
         the geometry file extension to search for
+    file_list : list
+        optional, result of scan_datum_directory for datums_directory, if not provided the directory is scanned here
 
     Returns
     -------
@@ -899,8 +1442,9 @@ def get_region_polygons(datums_directory: str, extension: str = 'kml') -> dict:
         dictionary of {kml name: kml path, ...}
     """
 
-    search_path = os.path.join(datums_directory, f'*/*.{extension}')
-    geom_list = glob.glob(search_path)
+    if file_list is None:
+        file_list = scan_datum_directory(datums_directory)
+    geom_list = _filter_by_extension(file_list, f'.{extension}')
     if len(geom_list) == 0:
         errmsg = f'No {extension} files found in the provided directory: {datums_directory}'
         print(errmsg)
@@ -912,7 +1456,135 @@ def get_region_polygons(datums_directory: str, extension: str = 'kml') -> dict:
     return geom
 
 
-def get_vdatum_uncertainties(vdatum_directory: str):
+def read_polygon_file(polygon_file: str):
+    """
+    Read the envelope and the valid-transform geometries from the provided polygon file.  Opening a polygon file
+    (kml especially) parses the whole file, so we get everything we need from one open.  Geometries are cloned so that
+    they remain valid after the file is closed.
+
+    Parameters
+    ----------
+    polygon_file
+        absolute file path to the kml/gpkg/shp region polygon file
+
+    Returns
+    -------
+    tuple
+        (min x, max x, min y, max y) for the file, None if there are no layers to read
+    list
+        list of ogr geometries for the valid-transform features in the polygon file
+    ogr.Geometry
+        geometry of the first feature in the first layer, None if the file has no features
+    """
+
+    envelope = None
+    valid_polys = []
+    first_poly = None
+    vector = ogr.Open(polygon_file)
+    if vector is None:
+        print(f'WARNING: Unable to open polygon file {polygon_file}')
+        return envelope, valid_polys, first_poly
+    layer_count = vector.GetLayerCount()
+    extents = []
+    for m in range(layer_count):
+        layer = vector.GetLayerByIndex(m)
+        extents.append(layer.GetExtent())
+        feature_count = layer.GetFeatureCount()
+        for n in range(feature_count):
+            feature = layer.GetNextFeature()
+            if feature is None:
+                continue
+            if first_poly is None and m == 0 and feature.GetGeometryRef() is not None:
+                first_poly = feature.GetGeometryRef().Clone()
+            try:
+                feature_name = feature.GetField(0)
+            except AttributeError:
+                print('WARNING: Unable to read feature name from feature in layer in {}'.format(polygon_file))
+                continue
+            if isinstance(feature_name, str) and feature_name.startswith('valid-transform'):
+                valid_polys.append(feature.GetGeometryRef().Clone())
+            feature = None
+        layer = None
+    vector = None
+    if extents:
+        envelope = (min(e[0] for e in extents), max(e[1] for e in extents),
+                    min(e[2] for e in extents), max(e[3] for e in extents))
+    return envelope, valid_polys, first_poly
+
+
+def geometry_intersects_bounds(bounds_geometry, bounds: tuple, geometry: ogr.Geometry):
+    """
+    Check if the geometry intersects the rectangle described by bounds.  The envelope of the geometry is checked first,
+    so that we only fall back to the full GEOS intersection test when the envelope straddles the rectangle edge.
+
+    Parameters
+    ----------
+    bounds_geometry
+        ogr polygon (or prepared geometry) built from bounds
+    bounds
+        (min x, min y, max x, max y) of the rectangle
+    geometry
+        ogr geometry to test against the rectangle
+
+    Returns
+    -------
+    bool
+        True if the geometry intersects the rectangle
+    """
+
+    x_min, y_min, x_max, y_max = bounds
+    geom_min_x, geom_max_x, geom_min_y, geom_max_y = geometry.GetEnvelope()
+    if geom_min_x > x_max or geom_max_x < x_min or geom_min_y > y_max or geom_max_y < y_min:
+        return False
+    if geom_min_x >= x_min and geom_max_x <= x_max and geom_min_y >= y_min and geom_max_y <= y_max:
+        # geometry is entirely within the rectangle
+        return not geometry.IsEmpty()
+    return bounds_geometry.Intersects(geometry)
+
+
+def prefetch_pipeline_grids(pipeline: str, vdatum_path: str):
+    """
+    Ask the operating system to start reading the grids used in the pipeline into memory.  PROJ reads the vertical
+    shift grids a few values at a time as it transforms the points, which is slow when the grids are not already in
+    the page cache.  Only does anything on platforms with posix_fadvise, and only once for each grid file.
+
+    Parameters
+    ----------
+    pipeline
+        PROJ pipeline string, the grids= entries are relative to vdatum_path
+    vdatum_path
+        path to the vdatum folder
+    """
+
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    for part in pipeline.split():
+        if part.startswith('grids='):
+            _prefetch_file(os.path.normpath(os.path.join(vdatum_path, part[len('grids='):])))
+
+
+@lru_cache(maxsize=None)
+def _prefetch_file(filepath: str):
+    """
+    Advise the operating system that we will need the whole file soon, see prefetch_pipeline_grids
+
+    Parameters
+    ----------
+    filepath
+        absolute file path to the grid
+    """
+
+    try:
+        fd = os.open(filepath, os.O_RDONLY)
+    except OSError:  # grid is missing or not readable, PROJ will report it when the pipeline is run
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+
+def get_vdatum_uncertainties(vdatum_directory: str, file_list: list = None):
     """"
     Parse the sigma file to build a dictionary of gridname: uncertainty for each layer.
 
@@ -920,6 +1592,8 @@ def get_vdatum_uncertainties(vdatum_directory: str):
     ----------
     vdatum_directory
         absolute folder path to the vdatum directory
+    file_list
+        optional, result of scan_datum_directory for vdatum_directory, if not provided the directory is scanned here
 
     Returns
     -------
@@ -929,41 +1603,43 @@ def get_vdatum_uncertainties(vdatum_directory: str):
     acc_file = os.path.join(vdatum_directory, 'vdatum_sigma.inf')
 
     # use the polygon search to get a dict of all grids quickly
-    grid_dict = get_region_polygons(vdatum_directory)
+    grid_dict = get_region_polygons(vdatum_directory, file_list=file_list)
     for k in grid_dict.keys():
         grid_dict[k] = {'tss': 0, 'mhhw': 0, 'mhw': 0, 'mlw': 0, 'mllw': 0, 'dtl': 0, 'mtl': 0}
     # add in the geoids we care about
     grid_entries = list(grid_dict.keys())
+    lower_entries = [entry.lower() for entry in grid_entries]
+    region_matches = {}  # sigma file region name to the grid entries that start with it, each region has several lines
     if os.path.exists(acc_file):
         with open(acc_file, 'r') as afil:
-            for line in afil.readlines():
+            # iterate over the file object, the lines are read as we go instead of building a list of lines first
+            for line in afil:
                 data = line.split('=')
                 if len(data) == 2:  # a valid line, ex: akglacier.navd88.lmsl=8.0
                     data_entry, val = data
                     sub_data = data_entry.split('.')
                     if len(sub_data) == 3:
                         region, src, target = sub_data
+                        val = val.strip()
                         if region == 'conus':
                             if src == 'navd88' and target == 'nad83':
-                                grid_dict['geoid12b'] = float(val.lstrip().rstrip()) * 0.01
+                                grid_dict['geoid12b'] = float(val) * 0.01
                             elif src in geoid_possibilities:
-                                grid_dict[f'{src}'] = float(val.lstrip().rstrip()) * 0.01
+                                grid_dict[f'{src}'] = float(val) * 0.01
                         else:
-                            match = np.where(np.array([entry.lower().find(region) for entry in grid_entries]) == 0)
-                            if match[0].size:
-                                if len(match[0]) > 1:
-                                    raise ValueError(f'Found multiple matches in vdatum_sigma file for entry {data_entry}')
-                                elif match:
-                                    grid_key = grid_entries[match[0][0]]
-                                    val = val.lstrip().rstrip()
-                                    if val == 'n/a':
-                                        val = 0
-                                    if src == 'navd88' and target == 'lmsl':
-                                        grid_dict[grid_key]['tss'] = float(val) * 0.01
-                                    elif src == 'lmsl':
-                                        grid_dict[grid_key][target] = float(val) * 0.01
-                                else:
-                                    print(f'No match for vdatum_sigma entry {data_entry}!')
+                            if region not in region_matches:
+                                region_matches[region] = [grid_entries[i] for i, entry in enumerate(lower_entries) if entry.startswith(region)]
+                            match = region_matches[region]
+                            if len(match) > 1:
+                                raise ValueError(f'Found multiple matches in vdatum_sigma file for entry {data_entry}')
+                            elif match:
+                                grid_key = match[0]
+                                if val == 'n/a':
+                                    val = 0
+                                if src == 'navd88' and target == 'lmsl':
+                                    grid_dict[grid_key]['tss'] = float(val) * 0.01
+                                elif src == 'lmsl':
+                                    grid_dict[grid_key][target] = float(val) * 0.01
     else:
         print(f'No uncertainty file found at {acc_file}')
     return grid_dict
@@ -985,15 +1661,10 @@ def read_regional_config(config_path: str) -> dict:
         key / value pairs for the region inforamtion.
 
     """
-    settings = {}
-    config_file = configparser.ConfigParser()
+    # no interpolation is used in the region config files, the raw parser skips that work
+    config_file = configparser.RawConfigParser()
     config_file.read(config_path)
-    sections = config_file.sections()
-    for section in sections:
-        config_file_section = config_file[section]
-        for key in config_file_section:
-            settings[key] = config_file_section[key]
-    return settings
+    return {key: val for section in config_file.sections() for key, val in config_file[section].items()}
 
 
 class StdErrFilter(logging.Filter):
@@ -1012,12 +1683,39 @@ class StdOutFilter(logging.Filter):
         return rec.levelno in (logging.DEBUG, logging.INFO)
 
 
+@lru_cache(maxsize=1)
+def _console_handlers():
+    """
+    Build the stdout/stderr handlers once, they are shared by all the loggers returned by return_logger
+
+    Returns
+    -------
+    logging.StreamHandler
+        stdout handler for DEBUG/INFO messages
+    logging.StreamHandler
+        stderr handler for WARNING/ERROR/CRITICAL messages
+    """
+
+    consolelogger = logging.StreamHandler(sys.stdout)
+    consolelogger.setLevel(logging.INFO)
+    #consolelogger.setFormatter(logging.Formatter(fmat))
+    consolelogger.addFilter(StdOutFilter())
+
+    errorlogger = logging.StreamHandler(sys.stderr)
+    errorlogger.setLevel(logging.WARNING)
+    #errorlogger.setFormatter(logging.Formatter(fmat))
+    errorlogger.addFilter(StdErrFilter())
+    return consolelogger, errorlogger
+
+
 def return_logger(logfile: str = None):
     """
     I disable the root logger by clearing out it's handlers because it always gets a default stderr log handler that
     ends up duplicating messages.  Since I want the stderr messages formatted nicely, I want to setup that handler \
     myself.
 
+    The console handlers are shared between all loggers, only the file handler is specific to the logfile.
+
     Parameters
     ----------
     logfile: str, path to the log file where you want the output driven to
@@ -1031,24 +1729,15 @@ def return_logger(logfile: str = None):
     if logfile:
         logger = logging.getLogger(logfile)
     else:
-        nowtime = datetime.now().strftime('%Y%m%d_%H%M%S')
-        logger = logging.getLogger(f'vyperdatum_{nowtime}')
+        logger = logging.getLogger('vyperdatum')
     logger.setLevel(logging.INFO)
 
-    consolelogger = logging.StreamHandler(sys.stdout)
-    consolelogger.setLevel(logging.INFO)
-    #consolelogger.setFormatter(logging.Formatter(fmat))
-    consolelogger.addFilter(StdOutFilter())
-
-    errorlogger = logging.StreamHandler(sys.stderr)
-    errorlogger.setLevel(logging.WARNING)
-    #errorlogger.setFormatter(logging.Formatter(fmat))
-    errorlogger.addFilter(StdErrFilter())
+    # logging.getLogger returns the same logger for the same name, only add the handlers that are not already there
+    for handler in _console_handlers():
+        if handler not in logger.handlers:
+            logger.addHandler(handler)
 
-    logger.addHandler(consolelogger)
-    logger.addHandler(errorlogger)
-
-    if logfile is not None:
+    if logfile is not None and not any(isinstance(handler, logging.FileHandler) for handler in logger.handlers):
         filelogger = logging.FileHandler(logfile)
         filelogger.setLevel(logging.INFO)
         filelogger.setFormatter(logging.Formatter(fmat))
@@ -1060,38 +1749,124 @@ def return_logger(logfile: str = None):
     return logger
 
 
-def hash_a_file(filepath: str):
+def hash_a_file(filepath: str, algorithm: str = 'md5'):
     """
-    Generate a new md5 hash for the provided file
+    Generate a new hash for the provided file
+
+    The vdatum_hashlookup tables are md5, so md5 is the default.  Any hashlib algorithm (ex: 'blake2b', 'sha256') can
+    be used, if the lookup tables are ever regenerated with a faster algorithm.
 
     Parameters
     ----------
     filepath
         full absolute file path to the file to hash
+    algorithm
+        name of the hashlib algorithm to use
 
     Returns
     -------
     str
-        new md5 hex digest for the file
+        new hex digest for the file
+    """
+
+    file_hash = hashlib.new(algorithm)
+    # read the file in 1MB chunks into the same buffer, rather than holding the whole grid in memory
+    buf = bytearray(1 << 20)
+    view = memoryview(buf)
+    with open(filepath, 'rb', buffering=0) as f:
+        while True:
+            nbytes = f.readinto(buf)
+            if not nbytes:
+                break
+            file_hash.update(view[:nbytes])
+    return file_hash.hexdigest()
+
+
+# stored next to the vdatum.config file, so that we never write into the (possibly shared or read only) vdatum folder
+hash_cache_path = os.path.join(os.path.expanduser('~'), 'vyperdatum', 'grid_hashes.json')
+
+
+def _read_hash_cache(cache_path: str) -> dict:
+    """
+    Read the grid hash cache written by hash_vdatum_grids
+
+    Parameters
+    ----------
+    cache_path
+        path to the hash cache json file
+
+    Returns
+    -------
+    dict
+        dictionary of {vdatum path: {file name: [file size, file modified time in ns, file hash]}}, empty if there is no
+        valid cache
     """
 
-    md5 = hashlib.md5()
-    with open(filepath, 'rb') as f:
-        data = f.read()
-        md5.update(data)
-    return md5.hexdigest()
+    try:
+        with open(cache_path, 'r') as cfile:
+            hash_cache = json.load(cfile)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(hash_cache, dict):
+        return {}
+    return hash_cache
 
 
-def hash_vdatum_grids(grid_files: dict, vdatum_path: str):
+def _write_hash_cache(cache_path: str, cache_key: str, grid_hashes: dict):
+    """
+    Add the grid hashes for one vdatum path to the hash cache.  Other processes may be updating the cache at the same
+    time, so the cache is read again just before writing to keep their entries, and written to a temporary file that
+    replaces the cache in one step, so that a reader never sees a partly written file.
+
+    Parameters
+    ----------
+    cache_path
+        path to the hash cache json file
+    cache_key
+        absolute path to the vdatum folder
+    grid_hashes
+        dictionary of {file name: [file size, file modified time in ns, file hash]}
+    """
+
+    temp_path = None
+    try:
+        cache_folder = os.path.dirname(cache_path)
+        os.makedirs(cache_folder, exist_ok=True)
+        full_hash_cache = _read_hash_cache(cache_path)
+        stored_hashes = full_hash_cache.get(cache_key)
+        if isinstance(stored_hashes, dict):
+            stored_hashes.update(grid_hashes)
+        else:
+            full_hash_cache[cache_key] = grid_hashes
+        temp_file, temp_path = tempfile.mkstemp(suffix='.tmp', dir=cache_folder)
+        with os.fdopen(temp_file, 'w') as cfile:
+            json.dump(full_hash_cache, cfile)
+        os.replace(temp_path, cache_path)
+    except OSError as e:  # the cache is only an optimization, carry on without it
+        logging.getLogger('vyperdatum').warning(f'Unable to write the grid hash cache {cache_path}: {e}')
+        if temp_path is not None and os.path.exists(temp_path):
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+def hash_vdatum_grids(grid_files: dict, vdatum_path: str, use_cache: bool = True):
     """
     Generate a new md5 hash for each grid file in the provided dictionary
 
+    Hashes are cached in a json file in the vyperdatum config folder (see hash_cache_path), keyed by the vdatum path,
+    along with the size and modified time of each grid.  A grid is only hashed again if the size or modified time has
+    changed.
+
     Parameters
     ----------
     grid_files
         dictionary of {file name: file path} for the grids in this vdatum directory
     vdatum_path
         path to the vdatum folder
+    use_cache
+        if False, will hash every grid and not read or write the hash cache
 
     Returns
     -------
@@ -1099,10 +1874,57 @@ def hash_vdatum_grids(grid_files: dict, vdatum_path: str):
         dictionary of {file path: file hash}
     """
 
+    cache_key = os.path.abspath(vdatum_path)
+    hash_cache = _read_hash_cache(hash_cache_path).get(cache_key) if use_cache else {}
+    if not isinstance(hash_cache, dict):
+        hash_cache = {}
     hashdict = {}
-    for grd in grid_files.keys():
-        hashdict[grd] = hash_a_file(os.path.join(vdatum_path, grd))
-    return hashdict
+    grid_stats = {}
+    # build the absolute path to each grid once, used for both the stat and the hash
+    grid_paths = {grd: os.path.join(vdatum_path, grd) for grd in grid_files.keys()}
+    for grd, grd_path in grid_paths.items():
+        grd_stat = os.stat(grd_path)
+        grid_stats[grd] = [grd_stat.st_size, grd_stat.st_mtime_ns]
+        cached = hash_cache.get(grd)
+        if isinstance(cached, list) and cached[:2] == grid_stats[grd] and len(cached) == 3:
+            hashdict[grd] = cached[2]
+
+    # hashlib releases the GIL while hashing large buffers, so the grids can be hashed in parallel threads.  Past a
+    #   handful of threads we are limited by the disk, so keep the pool small
+    grid_names = [grd for grd in grid_files.keys() if grd not in hashdict]
+    if grid_names:
+        with ThreadPoolExecutor(max_workers=min(8, len(grid_names))) as executor:
+            grid_hashes = executor.map(hash_a_file, [grid_paths[grd] for grd in grid_names])
+            hashdict.update(zip(grid_names, grid_hashes))
+        if use_cache:
+            _write_hash_cache(hash_cache_path, cache_key, {grd: grid_stats[grd] + [hashdict[grd]] for grd in grid_stats})
+    # keep the grid_files order
+    return {grd: hashdict[grd] for grd in grid_files.keys()}
+
+
+def return_vdatum_manifest(grid_files: dict, vdatum_path: str):
+    """
+    Build a hash of the name, size and modified time of each grid file.  This is cheap compared to hashing the grid
+    contents, and is stored with the vdatum version so that we can tell if the grids have changed since.
+
+    Parameters
+    ----------
+    grid_files
+        dictionary of {file name: file path} for the grids in this vdatum directory
+    vdatum_path
+        path to the vdatum folder
+
+    Returns
+    -------
+    str
+        hex digest of the grid manifest
+    """
+
+    manifest = []
+    for grd in sorted(grid_files.keys()):
+        grd_stat = os.stat(os.path.join(vdatum_path, grd))
+        manifest.append(f'{grd},{grd_stat.st_size},{int(grd_stat.st_mtime)}')
+    return hashlib.blake2b('\n'.join(manifest).encode(), digest_size=16).hexdigest()
 
 
 def return_vdatum_version(grid_files: dict, vdatum_path: str, save_path: str = None):
@@ -1126,20 +1948,30 @@ def return_vdatum_version(grid_files: dict, vdatum_path: str, save_path: str = N
     """
 
     myversion = ''
-    hashdict = hash_vdatum_grids(grid_files, vdatum_path)
     acc_file = os.path.join(vdatum_path, 'vdatum_sigma.inf')
     if os.path.exists(acc_file):
-        acc_hash = hash_a_file(acc_file)
-        cpy_vdatum_hashlookup = deepcopy(vdatum_hashlookup)
-        for vdversion, vdhashes in cpy_vdatum_hashlookup.items():
-            sigmahash = vdhashes.pop('vdatum_sigma.inf')
-            if hashdict == vdhashes and acc_hash == sigmahash:
-                myversion = vdversion
-                print('Found {}'.format(myversion))
-                break
+        # only versions with the same set of grids can match, skip hashing the grids if there are none
+        grid_names = set(grid_files.keys())
+        candidates = {vdversion: vdhashes for vdversion, vdhashes in vdatum_hashlookup.items()
+                      if set(vdhashes.keys()) - {'vdatum_sigma.inf'} == grid_names}
+        if candidates:
+            # the sigma file is a single small file that differs between versions, use it to narrow down the candidates
+            #   before hashing all the grids
+            acc_hash = hash_a_file(acc_file)
+            candidates = {vdversion: vdhashes for vdversion, vdhashes in candidates.items()
+                          if vdhashes['vdatum_sigma.inf'] == acc_hash}
+        if candidates:
+            hashdict = hash_vdatum_grids(grid_files, vdatum_path)
+            cpy_vdatum_hashlookup = deepcopy(candidates)
+            for vdversion, vdhashes in cpy_vdatum_hashlookup.items():
+                sigmahash = vdhashes.pop('vdatum_sigma.inf')
+                if hashdict == vdhashes and acc_hash == sigmahash:
+                    myversion = vdversion
+                    print('Found {}'.format(myversion))
+                    break
         if myversion and save_path:
             with open(save_path, 'w') as ofile:
-                ofile.write(myversion)
+                ofile.write(f'{myversion}\n{return_vdatum_manifest(grid_files, vdatum_path)}')
         if not myversion:
             raise EnvironmentError(f'Unable to find version for {vdatum_path} in the currently accepted versions: {list(vdatum_hashlookup.keys())}')
     else:
@@ -1147,6 +1979,33 @@ def return_vdatum_version(grid_files: dict, vdatum_path: str, save_path: str = N
     return myversion
 
 
+ellipse_wkt_template = 'VERTCRS["ellipse",VDATUM[REPLACEME],CS[vertical,1],AXIS["ellipsoid height (h)",up,LENGTHUNIT["metre",1]]]'
+
+
+@lru_cache(maxsize=128)
+def _ellipse_vertical_wkt(projcrs: int):
+    """
+    Build the ellipse vertical datum wkt string for the given projected crs, see vertical_datum_to_wkt.  Cached, as this
+    is generally called for many files that share the same projected crs.
+
+    Parameters
+    ----------
+    projcrs
+        projected crs epsg
+
+    Returns
+    -------
+    str
+        vypercrs wkt string
+    """
+
+    try:
+        horiz = CRS.from_epsg(projcrs)
+    except pyproj.exceptions.CRSError:
+        raise ValueError(f'vertical_datum_to_wkt: ERROR: unable to resolve HORIZONTAL={projcrs} as integer epsg code')
+    return ellipse_wkt_template.replace('REPLACEME', f'"{horiz.name} + ellipse"')
+
+
 def vertical_datum_to_wkt(datum_identifier: str, projcrs: int, min_lon: float, min_lat: float, max_lon: float, max_lat: float):
     """
     Translate the provided vertical datum identifier to vypercrs wkt string.  Used to build vertical datum wkt string
@@ -1188,12 +2047,7 @@ def vertical_datum_to_wkt(datum_identifier: str, projcrs: int, min_lon: float, m
         # 'VERTCRS["ellipse",VDATUM["NAD83 / UTM zone 17N + ellipse"],CS[vertical,1],AXIS["ellipsoid height (h)",up,LENGTHUNIT["metre",1]]]'
         # so you don't need to define VDatum version, etc.  Useful for non vdatum havers (some Kluster users), who still want this string
         # so we skip the vypercore initialization (which requires a vdatum path) and just do the below
-        try:
-            horiz = CRS.from_epsg(projcrs)
-        except pyproj.exceptions.CRSError:
-            raise ValueError(f'vertical_datum_to_wkt: ERROR: unable to resolve HORIZONTAL={projcrs} as integer epsg code')
-        wktstring = 'VERTCRS["ellipse",VDATUM[REPLACEME],CS[vertical,1],AXIS["ellipsoid height (h)",up,LENGTHUNIT["metre",1]]]'
-        wktstring = wktstring.replace('REPLACEME', f'"{horiz.name} + ellipse"')
+        wktstring = _ellipse_vertical_wkt(projcrs)
 
         # vc = VyperCore()
         # cs = VyperPipelineCRS(vc.datum_data)
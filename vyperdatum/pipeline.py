@@ -1,3 +1,4 @@
+from functools import lru_cache
 
 nad83_itrf2008_pipeline = '+proj=pipeline +step +proj=axisswap +order=2,1 ' \
                           '+step +proj=unitconvert +xy_in=deg +xy_out=rad ' \
@@ -18,33 +19,33 @@ nad83_itrf2014_pipeline = '+proj=pipeline +step +proj=axisswap +order=2,1 ' \
 reference_frames = ['nad83', 'itrf08']
 
 datum_definition = {
-    'ellipse'  : [],
-    'geoid'    : ['+proj=vgridshift grids=GEOID'],
-    'navd88'   : ['+proj=vgridshift grids=GEOID'],
-    'tss'      : ['+proj=vgridshift grids=GEOID',
-                  '+inv +proj=vgridshift grids=REGION\\tss.gtx'],
-    'mllw'     : ['+proj=vgridshift grids=GEOID',
-                  '+inv +proj=vgridshift grids=REGION\\tss.gtx',
-                  '+proj=vgridshift grids=REGION\\mllw.gtx'],
-    'noaa chart datum': ['+proj=vgridshift grids=GEOID',
-                         '+inv +proj=vgridshift grids=REGION\\tss.gtx',
-                         '+proj=vgridshift grids=REGION\\mllw.gtx'],
-    'mhw'     : ['+proj=vgridshift grids=GEOID',
-                 '+inv +proj=vgridshift grids=REGION\\tss.gtx',
-                 '+proj=vgridshift grids=REGION\\mhw.gtx'],
-    'noaa chart height': ['+proj=vgridshift grids=GEOID',
-                          '+inv +proj=vgridshift grids=REGION\\tss.gtx',
-                          '+proj=vgridshift grids=REGION\\mhw.gtx'],
-    'mtl'     : ['+proj=vgridshift grids=GEOID',
-                 '+inv +proj=vgridshift grids=REGION\\tss.gtx',
-                 '+proj=vgridshift grids=REGION\\mtl.gtx'],
-    'dtl'     : ['+proj=vgridshift grids=GEOID',
-                 '+inv +proj=vgridshift grids=REGION\\tss.gtx',
-                 '+proj=vgridshift grids=REGION\\dtl.gtx'],
-    'lwrp2007': ['+proj=vgridshift grids=GEOID',
-                 '+proj=vgridshift grids=REGION\\lwrp2007.gtx'],
-    'hrd'     : ['+proj=vgridshift grids=GEOID',
-                 '+proj=vgridshift grids=REGION\\hrd.gtx']
+    'ellipse'  : (),
+    'geoid'    : ('+proj=vgridshift grids={GEOID}',),
+    'navd88'   : ('+proj=vgridshift grids={GEOID}',),
+    'tss'      : ('+proj=vgridshift grids={GEOID}',
+                  '+inv +proj=vgridshift grids={REGION}\\tss.gtx'),
+    'mllw'     : ('+proj=vgridshift grids={GEOID}',
+                  '+inv +proj=vgridshift grids={REGION}\\tss.gtx',
+                  '+proj=vgridshift grids={REGION}\\mllw.gtx'),
+    'noaa chart datum': ('+proj=vgridshift grids={GEOID}',
+                         '+inv +proj=vgridshift grids={REGION}\\tss.gtx',
+                         '+proj=vgridshift grids={REGION}\\mllw.gtx'),
+    'mhw'     : ('+proj=vgridshift grids={GEOID}',
+                 '+inv +proj=vgridshift grids={REGION}\\tss.gtx',
+                 '+proj=vgridshift grids={REGION}\\mhw.gtx'),
+    'noaa chart height': ('+proj=vgridshift grids={GEOID}',
+                          '+inv +proj=vgridshift grids={REGION}\\tss.gtx',
+                          '+proj=vgridshift grids={REGION}\\mhw.gtx'),
+    'mtl'     : ('+proj=vgridshift grids={GEOID}',
+                 '+inv +proj=vgridshift grids={REGION}\\tss.gtx',
+                 '+proj=vgridshift grids={REGION}\\mtl.gtx'),
+    'dtl'     : ('+proj=vgridshift grids={GEOID}',
+                 '+inv +proj=vgridshift grids={REGION}\\tss.gtx',
+                 '+proj=vgridshift grids={REGION}\\dtl.gtx'),
+    'lwrp2007': ('+proj=vgridshift grids={GEOID}',
+                 '+proj=vgridshift grids={REGION}\\lwrp2007.gtx'),
+    'hrd'     : ('+proj=vgridshift grids={GEOID}',
+                 '+proj=vgridshift grids={REGION}\\hrd.gtx')
     }
 
 
@@ -76,20 +77,43 @@ def get_regional_pipeline(from_datum: str, to_datum: str, region_name: str, geoi
         provided datums.
 
     """
-    from_datum = from_datum.lower()
-    to_datum = to_datum.lower()
+    # lower case here so that the cache key is the same regardless of the case of the datum names
+    return _build_regional_pipeline(from_datum.lower(), to_datum.lower(), region_name, geoid_name)
+
+
+@lru_cache(maxsize=256)
+def _build_regional_pipeline(from_datum: str, to_datum: str, region_name: str, geoid_name: str):
+    """
+    Build the pipeline string for get_regional_pipeline.  The result only depends on the arguments and the module level
+    datum_definition, so it is cached.
+
+    Parameters
+    ----------
+    from_datum
+        lower case string corresponding to one of the stored datums
+    to_datum
+        lower case string corresponding to one of the stored datums
+    region_name
+        A region name corrisponding to a VDatum subfolder name.
+    geoid_name
+        name of the geoid used in the pipeline
+
+    Returns
+    -------
+    str
+        A string describing the pipeline to use to convert between the provided datums, None if the datums are the same
+    """
+
     if from_datum == to_datum:
         return None
 
     _validate_datum_names(from_datum, to_datum)
-    input_datum_def = datum_definition[from_datum].copy()
-    output_datum_def = datum_definition[to_datum].copy()
-    input_datum_def, output_datum_def = compare_datums(input_datum_def, output_datum_def)
-    reversed_input_def = inverse_datum_def(input_datum_def)
+    num_common = _common_layer_count(datum_definition[from_datum], datum_definition[to_datum])
+    reversed_input_def = inverse_datum_suffixes[from_datum][num_common]
+    output_datum_def = datum_definition[to_datum][num_common:]
     transformation_def = ['+proj=pipeline', *reversed_input_def, *output_datum_def]
-    pipeline = ' +step '.join(transformation_def)
-    regional_pipeline = pipeline.replace('REGION', region_name)
-    regional_pipeline = regional_pipeline.replace('GEOID', geoid_name)
+    # fill in the {REGION} and {GEOID} placeholders in one pass, the names themselves are never searched for placeholders
+    regional_pipeline = ' +step '.join(transformation_def).format(REGION=region_name, GEOID=geoid_name)
 
     return regional_pipeline
 
@@ -113,9 +137,9 @@ def _validate_datum_names(from_datum: str, to_datum: str):
         raise ValueError(f'Output datum {to_datum} not found in datum definitions: {list(datum_definition.keys())}')
 
 
-def compare_datums(in_datum_def: list, out_datum_def: list):
+def compare_datums(in_datum_def: tuple, out_datum_def: tuple):
     """
-    Compare two lists describing the datums.  Remove common parts of the definition starting from the first entry.
+    Compare two sequences describing the datums.  Remove common parts of the definition starting from the first entry.
     Stop when they do not agree.
 
     Parameters
@@ -131,15 +155,32 @@ def compare_datums(in_datum_def: list, out_datum_def: list):
         A reduced list of the input datum and output datum layers.
     """
 
+    num_common = _common_layer_count(in_datum_def, out_datum_def)
+    return [list(in_datum_def[num_common:]), list(out_datum_def[num_common:])]
+
+
+def _common_layer_count(in_datum_def: tuple, out_datum_def: tuple):
+    """
+    Return the number of layers, starting from the first entry, that the two datum definitions have in common.
+
+    Parameters
+    ----------
+    in_datum_def
+        The datum definition as described in the datum defition database.
+    out_datum_def
+        The datum definition as described in the datum defition database.
+
+    Returns
+    -------
+    int
+        number of common layers at the start of both definitions
+    """
+
     num_to_compare = min(len(in_datum_def), len(out_datum_def))
-    remove_these = []
-    for n in range(num_to_compare):
-        if in_datum_def[n] == out_datum_def[n]:
-            remove_these.append(in_datum_def[n])
-    for rmve in remove_these:
-        in_datum_def.remove(rmve)
-        out_datum_def.remove(rmve)
-    return [in_datum_def, out_datum_def]
+    num_common = 0
+    while num_common < num_to_compare and in_datum_def[num_common] == out_datum_def[num_common]:
+        num_common += 1
+    return num_common
 
 
 def inverse_datum_def(datum_def: list):
@@ -158,11 +199,10 @@ def inverse_datum_def(datum_def: list):
         The provided list reversed with 'inv' prepended to each layer.
 
     """
-    inverse = []
-    for layer in datum_def[::-1]:
-        if '+inv' in layer:
-            nlayer = layer.replace('+inv ', '')
-            inverse.append(nlayer)
-        else:
-            inverse.append(' '.join(['+inv', layer]))
-    return inverse
+    return [layer.replace('+inv ', '') if '+inv' in layer else ' '.join(['+inv', layer]) for layer in reversed(datum_def)]
+
+
+# the inverse of each datum definition with the first n layers removed, indexed by n.  compare_datums only ever removes
+#   common layers from the start of the definition, so these are all the inverses that get_regional_pipeline needs
+inverse_datum_suffixes = {datum: [inverse_datum_def(datum_def[n:]) for n in range(len(datum_def) + 1)]
+                          for datum, datum_def in datum_definition.items()}
@@ -1,10 +1,13 @@
 import os
 import numpy as np
 from osgeo import gdal
+from itertools import chain
 from typing import Union
 
 from vyperdatum.core import VyperCore
 
+csv_chunk_size = 100000  # number of points to format at once in export_to_csv
+
 
 class VyperPoints(VyperCore):
     """
@@ -23,7 +26,7 @@ class VyperPoints(VyperCore):
 
     def transform_points(self, input_datum: tuple, output_datum: Union[tuple, str], x: np.array, y: np.array,
                          z: np.array = None, include_vdatum_uncertainty: bool = True, include_region_index: bool = False,
-                         sample_distance: float = None):
+                         sample_distance: float = None, chunk_size: int = None):
         """
         Run transform_dataset to get the vertical transformed result / 3d transformed result.
 
@@ -51,12 +54,17 @@ class VyperPoints(VyperCore):
         sample_distance
             if a float is provided, we bin the points using a 2d grid of resolution sample_distance, and only run the
             grid center node location through vyperdatum
+        chunk_size
+            if an integer is provided (and sample_distance is not), transform the points in blocks of chunk_size points
+            to limit the memory used by the intermediate arrays of each transformation
         """
 
         self.set_input_datum(input_datum)
         self.set_output_datum(output_datum)
 
-        if not sample_distance:
+        if not sample_distance and chunk_size and len(x) > chunk_size:
+            self._transform_points_in_chunks(x, y, z, include_vdatum_uncertainty, include_region_index, chunk_size)
+        elif not sample_distance:
             self.x, self.y, self.z, self.unc, self.region_index = self.transform_dataset(x, y, z,
                                                                                          include_vdatum_uncertainty=include_vdatum_uncertainty,
                                                                                          include_region_index=include_region_index)
@@ -69,37 +77,70 @@ class VyperPoints(VyperCore):
                                                                           include_region_index=include_region_index)
 
             # handle nans
-            nan_mask = np.logical_and(~np.isnan(x), ~np.isnan(y))
+            valid_mask = np.isfinite(x)
+            valid_mask &= np.isfinite(y)
             # bin the raster cell locations to get which sep value applies
-            x_bins = np.digitize(x[nan_mask], x_range)
-            y_bins = np.digitize(y[nan_mask], y_range)
+            x_bins = uniform_bin_index(x[valid_mask], x_range)
+            y_bins = uniform_bin_index(y[valid_mask], y_range)
 
             # no 2d transformation is done with sampling interval, we can't just expand the xy coordinates
             self.x = None
             self.y = None
             z_sep = z_sep.reshape(xx_sampled.shape)
+            newz = z_sep[y_bins, x_bins]  # fancy indexing gives us a new array, safe to modify in place
             if z is not None:
                 if self.in_crs.is_height != self.out_crs.is_height:
-                    z = z.copy()
-                    z *= -1
-                newz = z_sep[y_bins - 1, x_bins - 1] + z[nan_mask]
-            else:
-                newz = z_sep[y_bins - 1, x_bins - 1]
-            self.z = np.zeros_like(z)
-            self.z[nan_mask] = newz
-            self.z[~nan_mask] = np.float32(np.nan)
+                    newz -= z[valid_mask]
+                else:
+                    newz += z[valid_mask]
+            self.z = np.full(x.shape, np.nan, dtype=z.dtype if z is not None else newz.dtype)
+            self.z[valid_mask] = newz
             if include_vdatum_uncertainty:
                 unc_new = unc_new.reshape(xx_sampled.shape)
-                unc_new = unc_new[y_bins - 1, x_bins - 1]
-                self.unc = np.zeros(z.shape, dtype=unc_new.dtype)
-                self.unc[nan_mask] = unc_new
-                self.unc[~nan_mask] = np.float32(np.nan)
+                self.unc = np.full(x.shape, np.nan, dtype=unc_new.dtype)
+                self.unc[valid_mask] = unc_new[y_bins, x_bins]
             if include_region_index:
                 regidx = regidx.reshape(xx_sampled.shape)
-                regidx = regidx[y_bins - 1, x_bins - 1]
-                self.region_index = np.zeros(z.shape, dtype=regidx.dtype)
-                self.region_index[nan_mask] = regidx
-                self.region_index[~nan_mask] = -1
+                self.region_index = np.full(x.shape, -1, dtype=regidx.dtype)
+                self.region_index[valid_mask] = regidx[y_bins, x_bins]
+
+    def _transform_points_in_chunks(self, x: np.array, y: np.array, z: np.array, include_vdatum_uncertainty: bool,
+                                    include_region_index: bool, chunk_size: int):
+        """
+        Run transform_dataset on blocks of chunk_size points, writing each result into the output arrays.  The extents
+        (and so the regions) are set from all of the points first, so that every block uses the same regions.
+
+        Parameters
+        ----------
+        x
+            longitude of the input data
+        y
+            latitude of the input data
+        z
+            optional, depth value of the input data, if not provided will use all zeros
+        include_vdatum_uncertainty
+            if True, will return the combined separation uncertainty for each point
+        include_region_index
+            if True, will return the integer index of the region used for each point
+        chunk_size
+            number of points to transform at once
+        """
+
+        extents = (float(np.nanmin(x)), float(np.nanmin(y)), float(np.nanmax(x)), float(np.nanmax(y)))
+        self._set_extents(extents)
+        self.x, self.y, self.z, self.unc, self.region_index = None, None, None, None, None
+        for start in range(0, len(x), chunk_size):
+            end = start + chunk_size
+            chunk_z = z[start:end] if z is not None else None
+            chunk_result = self.transform_dataset(x[start:end], y[start:end], chunk_z,
+                                                  include_vdatum_uncertainty=include_vdatum_uncertainty,
+                                                  include_region_index=include_region_index)
+            if start == 0:  # allocate the outputs once, using the dtypes of the first block
+                self.x, self.y, self.z, self.unc, self.region_index = [np.empty(len(x), dtype=rslt.dtype) if rslt is not None else None
+                                                                       for rslt in chunk_result]
+            for output, rslt in zip([self.x, self.y, self.z, self.unc, self.region_index], chunk_result):
+                if output is not None:
+                    output[start:end] = rslt
 
     def export_to_csv(self, output_file: str, delimiter: str = ' '):
         """
@@ -114,8 +155,13 @@ class VyperPoints(VyperCore):
         """
 
         dset_vars = [dvar for dvar in [self.x, self.y, self.z, self.unc, self.region_index] if dvar is not None]
-        dset = np.c_[dset_vars]
-        np.savetxt(output_file, dset, delimiter=delimiter, comments='')
+        # one row per point, keep the integer region index as an integer instead of stacking everything as float64
+        row_fmt = delimiter.join('%d' if np.issubdtype(dvar.dtype, np.integer) else '%.18e' for dvar in dset_vars) + '\n'
+        with open(output_file, 'w') as ofile:
+            # format a chunk of rows with one string operation instead of formatting row by row like np.savetxt
+            for start in range(0, len(dset_vars[0]), csv_chunk_size):
+                chunk_rows = list(zip(*[dvar[start:start + csv_chunk_size].tolist() for dvar in dset_vars]))
+                ofile.write((row_fmt * len(chunk_rows)) % tuple(chain.from_iterable(chunk_rows)))
 
 
 def sample_array(min_x: float, max_x: float, min_y: float, max_y: float, sampling_distance: float, center: bool = True):
@@ -141,9 +187,9 @@ def sample_array(min_x: float, max_x: float, min_y: float, max_y: float, samplin
     Returns
     -------
     np.ndarray
-        2d array of x values for the new sampled grid
+        2d array of x values for the new sampled grid, as a read only broadcast view
     np.ndarray
-        2d array of y values for the new sampled grid
+        2d array of y values for the new sampled grid, as a read only broadcast view
     np.array
         1d array of the x values for one column of the grid, i.e. the x range of the grid
     np.array
@@ -174,7 +220,34 @@ def sample_array(min_x: float, max_x: float, min_y: float, max_y: float, samplin
         x_sampled = x_range
         y_sampled = y_range
 
-    # grid with yx order to match gdal
-    yy, xx = np.meshgrid(y_sampled, x_sampled, indexing='ij')
+    # grid with yx order to match gdal.  Broadcast views instead of meshgrid, so we don't store two full grids
+    grid_shape = (len(y_sampled), len(x_sampled))
+    xx = np.broadcast_to(x_sampled, grid_shape)
+    yy = np.broadcast_to(y_sampled[:, np.newaxis], grid_shape)
 
     return xx, yy, x_range, y_range
+
+
+def uniform_bin_index(values: np.array, bin_edges: np.array):
+    """
+    Return the index of the bin that each value falls in, for the evenly spaced bin edges built by sample_array.  This
+    is np.digitize(values, bin_edges) - 1, but as the bins are evenly spaced we can get the index directly instead of
+    searching the edges.
+
+    Parameters
+    ----------
+    values
+        1d array of values within the range of bin_edges
+    bin_edges
+        1d array of evenly spaced, increasing bin edges
+
+    Returns
+    -------
+    np.array
+        1d array of the bin index for each value, clipped to the valid bins
+    """
+
+    step = (bin_edges[-1] - bin_edges[0]) / (len(bin_edges) - 1)
+    bin_index = np.floor((values - bin_edges[0]) / step).astype(np.intp)
+    np.clip(bin_index, 0, len(bin_edges) - 2, out=bin_index)
+    return bin_index
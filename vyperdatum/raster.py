@@ -1,15 +1,44 @@
 from time import perf_counter
 import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from typing import Union
 from osgeo import gdal
 import pyproj
-from pyproj import Transformer, CRS
+from pyproj import CRS
 from pyproj.exceptions import CRSError
 
-from vyperdatum.core import VyperCore
+from vyperdatum.core import VyperCore, get_crs_transformer
 from vyperdatum.vypercrs import get_transformation_pipeline
 
+# tiled, lossless compressed output, with the block compression spread across all cores
+geotiff_creation_options = ['TILED=YES', 'COMPRESS=DEFLATE', 'PREDICTOR=3', 'NUM_THREADS=ALL_CPUS', 'BIGTIFF=IF_SAFER']
+
+
+class RasterLayers(list):
+    """
+    List of the raster band arrays.  Bands that have not been read yet are stored as None, and are read with the
+    provided load_band function the first time they are accessed.
+    """
+
+    def __init__(self, layers: list, load_band):
+        super().__init__(layers)
+        self._load_band = load_band
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        lyr = super().__getitem__(idx)
+        if lyr is None:
+            idx = range(len(self))[idx]  # positive index for negative idx
+            lyr = self._load_band(idx)
+            super().__setitem__(idx, lyr)
+        return lyr
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
 
 class VyperRaster(VyperCore):
     """
@@ -30,12 +59,15 @@ class VyperRaster(VyperCore):
         self.height = None
 
         self.layers = []
+        self._raster_dataset = None  # gdal dataset kept open for reading the other bands on demand, see _load_band
         self.layernames = []
         self.nodatavalue = []
+        self._layer_name_index = {}  # lower case layer name to the index of that layer, see initialize
 
         self.raster_vdatum_sep = None
         self.raster_vdatum_uncertainty = None
         self.raster_vdatum_region_index = None
+        self.raster_vdatum_missing = None  # boolean mask of the cells with no separation value, see get_datum_sep
 
         self.output_geotransform = None
 
@@ -55,13 +87,16 @@ class VyperRaster(VyperCore):
 
         if self.raster_vdatum_sep is None:
             self.log_error('No separation grid found, make sure you run get_datum_sep first', ValueError)
-        return np.count_nonzero(np.isnan(self.raster_vdatum_sep)) == 0
+        return not self.raster_vdatum_missing.any()
 
     def initialize(self, input_file: str = None):
         """
         Get all the data we need from the input raster.  This is run automatically on instancing this class, if an input
         file is provided then.  Otherwise, use this method and provide a gdal supported file to initialize.
 
+        Only the elevation, uncertainty and contributor bands are read here, the other layers are read the first time
+        they are accessed in self.layers (see RasterLayers).
+
         Parameters
         ----------
         input_file
@@ -76,13 +111,23 @@ class VyperRaster(VyperCore):
             self.log_error(f'Unable to open {self.input_file} with gdal', ValueError)
 
         self.log_info(f'Operating on {self.input_file}')
-        self.layers = [ofile.GetRasterBand(i + 1).ReadAsArray() for i in range(ofile.RasterCount)]
-        self.nodatavalue = [ofile.GetRasterBand(i + 1).GetNoDataValue() for i in range(ofile.RasterCount)]
-        self.layernames = [ofile.GetRasterBand(i + 1).GetDescription() for i in range(ofile.RasterCount)]
-
-        # readasarray doesn't seem to handle gdal nodatavalue NaN
-        for lyr, ndv in zip(self.layers, self.nodatavalue):
-            lyr[lyr == ndv] = np.nan
+        bands = [ofile.GetRasterBand(i + 1) for i in range(ofile.RasterCount)]
+        self.nodatavalue = [band.GetNoDataValue() for band in bands]
+        self.layernames = [band.GetDescription() for band in bands]
+        self._layer_name_index = {}
+        for cnt, lname in enumerate(self.layernames):
+            self._layer_name_index.setdefault(lname.lower(), cnt)  # keep the first layer with the name, like list.index
+        used_layers = self._get_used_layer_indices()
+        self._raster_dataset = ofile
+        if len(used_layers) == len(bands) > 1 and len(set(band.DataType for band in bands)) == 1:
+            # read all the bands in one request, each layer is a view of the (bands, rows, cols) array
+            layers = [self._fix_layer_nodata(lyr, ndv) for lyr, ndv in zip(ofile.ReadAsArray(), self.nodatavalue)]
+        else:
+            layers = [None] * len(bands)
+        bands = None
+        self.layers = RasterLayers(layers, self._load_band)
+        for cnt in used_layers:
+            self.layers[cnt]  # read the layers that apply_sep uses now, the rest are read on first access
 
         # geotransform in this format [x origin, x pixel size, x rotation, y origin, y rotation, -y pixel size]
         self.geotransform = ofile.GetGeoTransform()
@@ -95,7 +140,75 @@ class VyperRaster(VyperCore):
         input_crs = ofile.GetSpatialRef()
         self.input_wkt = input_crs.ExportToWkt()
         self.set_input_datum(self.input_wkt, extents = (min_x, min_y, max_x, max_y))
-        ofile = None
+
+    def _load_band(self, layer_index: int):
+        """
+        Read a band from the raster opened in initialize, with the nodata values replaced with NaN
+
+        Parameters
+        ----------
+        layer_index
+            integer index in self.layernames for the band to read
+
+        Returns
+        -------
+        np.ndarray
+            2d array of the band values
+        """
+
+        band = self._raster_dataset.GetRasterBand(layer_index + 1)
+        return self._fix_layer_nodata(band.ReadAsArray(), self.nodatavalue[layer_index])
+
+    @staticmethod
+    def _fix_layer_nodata(lyr: np.ndarray, ndv: float):
+        """
+        Replace the nodata values in the layer with NaN.  Readasarray doesn't seem to handle gdal nodatavalue NaN.
+
+        Parameters
+        ----------
+        lyr
+            2d array of the band values
+        ndv
+            nodata value of the band, None if the band has no nodata value
+
+        Returns
+        -------
+        np.ndarray
+            lyr with nodata as NaN, a new float32 array if lyr is an integer array
+        """
+
+        if ndv is None or np.isnan(ndv):  # nothing to replace, a NaN nodatavalue is already NaN in the array
+            return lyr
+        # compare in the source dtype, one pass to build the mask and one in place pass to fill it
+        nodata_mask = lyr == ndv
+        if lyr.dtype.kind in 'iu':  # integer bands can't hold NaN, the rest of the processing expects NaN nodata
+            lyr = lyr.astype(np.float32)
+        np.putmask(lyr, nodata_mask, np.nan)
+        return lyr
+
+    def _get_used_layer_indices(self):
+        """
+        Find the layers that apply_sep uses, the same as the elevation, uncertainty and contributor layer index methods
+        but without logging the missing layers.  If we can't find the elevation layer, all layers are used.
+
+        Returns
+        -------
+        set
+            set of integer indices in self.layernames for the layers to read
+        """
+
+        if len(self.layernames) == 1:
+            return {0}
+        elev_idx = self._layer_name_index.get('depth', self._layer_name_index.get('elevation'))
+        if elev_idx is None:
+            return set(range(len(self.layernames)))
+        used_layers = {elev_idx}
+        unc_idx = self._layer_name_index.get('uncertainty', self._layer_name_index.get('vertical uncertainty'))
+        if unc_idx is not None:
+            used_layers.add(unc_idx)
+        if 'contributor' in self._layer_name_index:
+            used_layers.add(self._layer_name_index['contributor'])
+        return used_layers
 
     def _get_elevation_layer_index(self):
         """
@@ -104,19 +217,18 @@ class VyperRaster(VyperCore):
         Returns
         -------
         int
-            integer index in self.layernames for the elevation layer, -1 if it does not exist
+            integer index in self.layernames for the elevation layer, None if it does not exist
         """
 
-        check_layer_names = [lname.lower() for lname in self.layernames]
-        if len(check_layer_names) == 1:
+        if len(self.layernames) == 1:
             depth_idx = 0
-        elif 'depth' in check_layer_names:
-            depth_idx = check_layer_names.index('depth')
-        elif 'elevation' in check_layer_names:
-            depth_idx = check_layer_names.index('elevation')
+        elif 'depth' in self._layer_name_index:
+            depth_idx = self._layer_name_index['depth']
+        elif 'elevation' in self._layer_name_index:
+            depth_idx = self._layer_name_index['elevation']
         else:
             depth_idx = None
-            self.log_warning(f'Unable to find depth or elevation layer by name, layers={check_layer_names}')
+            self.log_warning(f'Unable to find depth or elevation layer by name, layers={list(self._layer_name_index)}')
         return depth_idx
 
     def _get_uncertainty_layer_index(self):
@@ -126,17 +238,16 @@ class VyperRaster(VyperCore):
         Returns
         -------
         int
-            integer index in self.layernames for the uncertainty layer, -1 if it does not exist
+            integer index in self.layernames for the uncertainty layer, None if it does not exist
         """
 
-        check_layer_names = [lname.lower() for lname in self.layernames]
-        if 'uncertainty' in check_layer_names:
-            unc_idx = check_layer_names.index('uncertainty')
-        elif 'vertical uncertainty' in check_layer_names:
-            unc_idx = check_layer_names.index('vertical uncertainty')
+        if 'uncertainty' in self._layer_name_index:
+            unc_idx = self._layer_name_index['uncertainty']
+        elif 'vertical uncertainty' in self._layer_name_index:
+            unc_idx = self._layer_name_index['vertical uncertainty']
         else:
             unc_idx = None
-            self.log_warning(f'Unable to find uncertainty or vertical uncertainty layer by name, layers={check_layer_names}')
+            self.log_warning(f'Unable to find uncertainty or vertical uncertainty layer by name, layers={list(self._layer_name_index)}')
         return unc_idx
 
     def _get_contributor_layer_index(self):
@@ -146,15 +257,14 @@ class VyperRaster(VyperCore):
         Returns
         -------
         int
-            integer index in self.layernames for the contributor layer, -1 if it does not exist
+            integer index in self.layernames for the contributor layer, None if it does not exist
         """
 
-        check_layer_names = [lname.lower() for lname in self.layernames]
-        if 'contributor' in check_layer_names:
-            cont_idx = check_layer_names.index('contributor')
+        if 'contributor' in self._layer_name_index:
+            cont_idx = self._layer_name_index['contributor']
         else:
             cont_idx = None
-            self.log_warning(f'Unable to find contributor layer by name, layers={check_layer_names}')
+            self.log_warning(f'Unable to find contributor layer by name, layers={list(self._layer_name_index)}')
         return cont_idx
 
     def get_datum_sep(self):
@@ -192,7 +302,7 @@ class VyperRaster(VyperCore):
         self.regional_seps = []
         self.regional_uncertainties = []
         valid_counts = []
-        valid_idx = []
+        valid_masks = []  # boolean masks rather than np.where index arrays, 1 byte per cell instead of 16
         valid_regions = []
         for region in self.regions:
             gframe = self.datum_data.get_geoid_frame(region)
@@ -203,17 +313,19 @@ class VyperRaster(VyperCore):
             if not valid_pipeline:
                 self.log_info(f'Pipeline {pipeline} for transformation from {self.in_crs.to_wkt()} to {self.out_crs.to_wkt()} in region {region} was flagged as invalid.  Missing support files?')
                 continue
-            elif pipeline:
-                regional_sep = self._get_regional_datum_sep(pipeline)
-            else:
+            elif not pipeline:
                 self.log_info(f'Null transformation from {self.in_crs.to_wkt()} to {self.out_crs.to_wkt()} in region {region}')
-                regional_sep = np.zeros(self.layers[0].shape)
             valid_regions.append(region)
-            self.pipelines.append(pipeline)   
-            self.regional_seps.append(regional_sep)
-            valid = np.where(~np.isnan(regional_sep))
-            valid_idx.append(valid)
-            valid_counts.append(len(valid[0]))
+            self.pipelines.append(pipeline)
+
+        # the regions are independent and gdal releases the GIL while warping, so build the regional seps at the same time
+        with ThreadPoolExecutor(max_workers=max(1, min(len(self.pipelines), os.cpu_count() or 1))) as executor:
+            self.regional_seps = list(executor.map(self._get_regional_datum_sep, self.pipelines))
+
+        for region, regional_sep in zip(valid_regions, self.regional_seps):
+            valid = ~np.isnan(regional_sep)
+            valid_masks.append(valid)
+            valid_counts.append(np.count_nonzero(valid))
             datum_unc = self._get_output_uncertainty(region)
             regional_uncertainty = np.full(regional_sep.shape, np.nan)
             regional_uncertainty[valid] = datum_unc
@@ -222,15 +334,18 @@ class VyperRaster(VyperCore):
             self._regions = valid_regions
             self.in_crs.update_regions(valid_regions)
             self.out_crs.update_regions(valid_regions)
-            # combine the regional seps
-            self.raster_vdatum_sep = np.full((self.height, self.width), np.nan)
+            # combine the regional seps.  The vdatum grids are float32, so the sep is stored in float32 without losing
+            #   anything, apply_sep does the arithmetic in float64
+            self.raster_vdatum_sep = np.full((self.height, self.width), np.nan, dtype=np.float32)
             self.raster_vdatum_uncertainty = np.full((self.height, self.width), np.nan)
             self.raster_vdatum_region_index = np.full((self.height, self.width), np.nan)
             stack_order = np.argsort(valid_counts)
             for idx in stack_order:
-                self.raster_vdatum_sep[valid_idx[idx]] = self.regional_seps[idx][valid_idx[idx]]
-                self.raster_vdatum_uncertainty[valid_idx[idx]] = self.regional_uncertainties[idx][valid_idx[idx]]
-                self.raster_vdatum_region_index[valid_idx[idx]] = idx
+                np.copyto(self.raster_vdatum_sep, self.regional_seps[idx], where=valid_masks[idx])
+                np.copyto(self.raster_vdatum_uncertainty, self.regional_uncertainties[idx], where=valid_masks[idx])
+                self.raster_vdatum_region_index[valid_masks[idx]] = idx
+            # cells that no region covers, computed once here for is_covered and apply_sep
+            self.raster_vdatum_missing = np.isnan(self.raster_vdatum_sep)
         else:
             self.log_error('No valid region found with the specified datum transformation. Unable to perform transformation', ValueError)
 
@@ -241,7 +356,7 @@ class VyperRaster(VyperCore):
         Parameters
         ----------
         pipeline
-            PROJ pipeline to be used
+            PROJ pipeline to be used, None for a null transformation
 
         Returns
         -------
@@ -249,7 +364,11 @@ class VyperRaster(VyperCore):
             2d array of sep values
         """
 
+        if not pipeline:  # null transformation
+            return np.zeros((self.height, self.width), dtype=np.float32)
+
         regional_sep = None
+        step_buffer = None  # reused for reading each grid after the first
         for cmd in pipeline.split(' +step '):
             if cmd.find('vgridshift') >= 0:
                 inv = False
@@ -273,16 +392,25 @@ class VyperRaster(VyperCore):
                                xRes = self.resolution_x, yRes = self.resolution_y, 
                                outputBounds = [self.min_x, self.min_y, self.max_x, self.max_y])
                 band = ds.GetRasterBand(1)
-                array = band.ReadAsArray()
+                if regional_sep is None:
+                    array = band.ReadAsArray()
+                else:  # read straight into the step buffer, instead of allocating a new array for every grid
+                    if step_buffer is None:
+                        step_buffer = np.empty_like(regional_sep)
+                    array = band.ReadAsArray(buf_obj=step_buffer)
                 nodata = band.GetNoDataValue()
-                array[np.where(array == nodata)] = np.nan
-                if not inv:
-                    array *= -1
+                if nodata is not None:
+                    np.putmask(array, array == nodata, np.nan)
+                band = None
                 ds = None
                 if regional_sep is None:
-                    regional_sep = array.copy()
-                else:
+                    if not inv:
+                        np.negative(array, out=array)
+                    regional_sep = array  # ReadAsArray gives us a new array, no need to copy it
+                elif inv:
                     regional_sep += array
+                else:  # subtract instead of negating the array first, one pass over the grid
+                    regional_sep -= array
         return regional_sep
 
     def apply_sep(self, allow_points_outside_coverage: bool = False, include_uncertainty: bool = True):
@@ -334,7 +462,6 @@ class VyperRaster(VyperCore):
                 had_uncertainty = True
             else:
                 layernames.append('Uncertainty')
-                uncertainty_layer_idx = len(layernodata)
                 layernodata.append(self.nodatavalue[elevation_layer_idx])
                 had_uncertainty = False
         else:
@@ -345,12 +472,17 @@ class VyperRaster(VyperCore):
             contributor_layer = self.layers[contributor_layer_idx]
             layernames.append(self.layernames[contributor_layer_idx])
             layernodata.append(self.nodatavalue[contributor_layer_idx])
+        # the layer indices above are positions in the source raster, the nodata values we write are in the order of
+        #   the returned layers (elevation, uncertainty, contributor)
+        elevation_nodata = layernodata[0]
+        uncertainty_nodata = layernodata[1]
+        contributor_nodata = layernodata[2] if contributor_layer is not None else None
 
+        # boolean masks instead of np.where index arrays, so each mask is one pass and one byte per cell
         elev_nodata = np.isnan(elevation_layer)
-        elev_nodata_idx = np.where(elev_nodata)
-        missing = np.isnan(self.raster_vdatum_sep)
-        missing_idx = np.where(missing & ~elev_nodata)
-        missing_count = len(missing_idx[0])
+        missing = self.raster_vdatum_missing.copy()  # copy the stored mask, we modify this one
+        missing[elev_nodata] = False
+        missing_count = np.count_nonzero(missing)
         self.log_info(f'Applying vdatum separation model to {self.raster_vdatum_sep.size} total points')
 
         if self.in_crs.is_height == self.out_crs.is_height:
@@ -358,49 +490,68 @@ class VyperRaster(VyperCore):
         else:
             flip = -1
 
-        if self.in_crs.is_height:
-            final_elevation_layer = flip * (elevation_layer + self.raster_vdatum_sep)
-        else:
-            final_elevation_layer = flip * (elevation_layer - self.raster_vdatum_sep)
-        final_elevation_layer[elev_nodata_idx] = layernodata[elevation_layer_idx]
+        def _build_final_elevation():
+            if self.in_crs.is_height:
+                final_elevation = np.add(elevation_layer, self.raster_vdatum_sep, dtype=np.float64)
+            else:
+                final_elevation = np.subtract(elevation_layer, self.raster_vdatum_sep, dtype=np.float64)
+            if flip == -1:
+                np.negative(final_elevation, out=final_elevation)
+            final_elevation[elev_nodata] = elevation_nodata
+            return final_elevation
 
-        if include_uncertainty:
+        def _build_final_uncertainty():
             if had_uncertainty:
-                final_uncertainty_layer = uncertainty_layer + self.raster_vdatum_uncertainty
+                final_uncertainty = uncertainty_layer + self.raster_vdatum_uncertainty
             else:
-                final_uncertainty_layer = self.raster_vdatum_uncertainty
-        
-            final_uncertainty_layer[elev_nodata_idx] = layernodata[uncertainty_layer_idx]
+                final_uncertainty = self.raster_vdatum_uncertainty
+            final_uncertainty[elev_nodata] = uncertainty_nodata
+            return final_uncertainty
+
+        if include_uncertainty:
+            # the layers are independent and numpy releases the GIL for these full raster operations, so build the
+            #   elevation and uncertainty layers at the same time
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                elevation_future = executor.submit(_build_final_elevation)
+                uncertainty_future = executor.submit(_build_final_uncertainty)
+                if contributor_layer is not None:
+                    contributor_layer[elev_nodata] = contributor_nodata
+                final_elevation_layer = elevation_future.result()
+                final_uncertainty_layer = uncertainty_future.result()
         else:
+            final_elevation_layer = _build_final_elevation()
             final_uncertainty_layer = None
-
-        if contributor_layer is not None:
-            contributor_layer[elev_nodata_idx] = layernodata[contributor_layer_idx]
+            if contributor_layer is not None:
+                contributor_layer[elev_nodata] = contributor_nodata
 
         if missing_count > 0:
             if allow_points_outside_coverage:
                 self.log_info(f'Allowing {missing_count} points that are outside of vdatum coverage.')
-                final_elevation_layer[missing_idx] = flip * elevation_layer[missing_idx]
-                if self.in_crs.is_height:
-                    z_values = elevation_layer[missing_idx]
-                else:
-                    z_values = -elevation_layer[missing_idx]
+                z_values = elevation_layer[missing]
+                final_elevation_layer[missing] = flip * z_values
+                if not self.in_crs.is_height:
+                    np.negative(z_values, out=z_values)
                 if include_uncertainty:
-                    u_values = 3 - 0.06 * z_values
-                    u_values[np.where(z_values > 0)] = 3.0
+                    # CATZOC D vertical uncertainty, 3 - 0.06 * z capped at 3.0 above 0, computed in one buffer
+                    above_zero = z_values > 0
+                    u_values = np.multiply(z_values, -0.06)
+                    u_values += 3
+                    u_values[above_zero] = 3.0
                     if had_uncertainty:
-                        keep_uncert_sub_idx = np.where(u_values < uncertainty_layer[missing_idx])[0]
-                        if len(keep_uncert_sub_idx) > 0:
-                            self.log_info(f'Maintaining {len(keep_uncert_sub_idx)} points from source uncertainty since greater than CATZOC D vertical uncertainty.')
-                            u_values[keep_uncert_sub_idx] = uncertainty_layer[missing_idx[0][keep_uncert_sub_idx], missing_idx[1][keep_uncert_sub_idx]]
-                    final_uncertainty_layer[missing_idx] = u_values
+                        source_uncertainty = uncertainty_layer[missing]
+                        keep_uncert = u_values < source_uncertainty
+                        keep_count = np.count_nonzero(keep_uncert)
+                        if keep_count > 0:
+                            self.log_info(f'Maintaining {keep_count} points from source uncertainty since greater than CATZOC D vertical uncertainty.')
+                            u_values[keep_uncert] = source_uncertainty[keep_uncert]
+                    final_uncertainty_layer[missing] = u_values
             else:
                 self.log_info(f'applying nodatavalue to {missing_count} points that are outside of vdatum coverage')
-                final_elevation_layer[missing_idx] = layernodata[elevation_layer_idx]
+                final_elevation_layer[missing] = elevation_nodata
                 if include_uncertainty:
-                    final_uncertainty_layer[missing_idx] = layernodata[uncertainty_layer_idx]
+                    final_uncertainty_layer[missing] = uncertainty_nodata
                 if contributor_layer is not None:
-                    contributor_layer[missing_idx] = layernodata[contributor_layer_idx]
+                    contributor_layer[missing] = contributor_nodata
 
         layers = (final_elevation_layer, final_uncertainty_layer, contributor_layer)
         return layers, layernames, layernodata
@@ -455,15 +606,18 @@ class VyperRaster(VyperCore):
             remove_layers = []
             for cnt, lyr in enumerate(layers):
                 if lyr is not None:
-                    final_layers.append(lyr[None, :, :])
+                    final_layers.append(lyr)
                 else:
                     remove_layers.append(cnt)
             for lyrnum in remove_layers[::-1]:
                 layers = layers[:lyrnum] + layers[lyrnum + 1:]
                 layernames = layernames[:lyrnum] + layernames[lyrnum + 1:]
                 layernodata = layernodata[:lyrnum] + layernodata[lyrnum + 1:]
-            tiffdata = np.concatenate(final_layers)
-            tiffdata = np.round(tiffdata, 3)
+            # the geotiff bands are float32, fill a float32 stack rather than concatenating the (float64) layers.  Round
+            #   each layer before the cast, so the values match rounding the float64 layer
+            tiffdata = np.empty((len(final_layers), *final_layers[0].shape), dtype=np.float32)
+            for cnt, lyr in enumerate(final_layers):
+                tiffdata[cnt] = np.round(lyr, 3)
             self._write_gdal_geotiff(output_filename, tiffdata, layernames, layernodata)
         end_cnt = perf_counter()
         self.log_info(f'Raster transformation complete: Elapsed time {end_cnt - start_cnt} seconds')
@@ -478,14 +632,10 @@ class VyperRaster(VyperCore):
         if out_crs.is_vertical:
             self.log_error(f'Only 2d coordinate system epsg supported when using the new_2d_crs option, got {destination_epsg}',
                            ValueError)
-        in_crs = CRS.from_epsg(6319)
-        # Transformer.transform input order is based on the CRS, see CRS.geodetic_crs.axis_info
-        # - lon, lat - this appears to be valid when using CRS from proj4 string
-        # - lat, lon - this appears to be valid when using CRS from epsg
-        # use the always_xy option to force the transform to expect lon/lat order
-        transformer = Transformer.from_crs(in_crs, out_crs, always_xy=True)
-        new_min_x, new_min_y = transformer.transform(self.geographic_min_x, self.geographic_min_y)
-        new_max_x, new_max_y = transformer.transform(self.geographic_max_x, self.geographic_max_y)
+        # cached transformer, always uses lon/lat order, see core.get_crs_transformer
+        transformer = get_crs_transformer(6319, out_crs)
+        (new_min_x, new_max_x), (new_min_y, new_max_y) = transformer.transform([self.geographic_min_x, self.geographic_max_x],
+                                                                               [self.geographic_min_y, self.geographic_max_y])
 
         # if out_crs.is_projected:
         #     if new_min_x < 0:
@@ -531,7 +681,7 @@ class VyperRaster(VyperCore):
 
         numlyrs, rows, cols = data.shape
         driver = gdal.GetDriverByName('GTiff')
-        out_raster = driver.Create(outfile, cols, rows, numlyrs, gdal.GDT_Float32)
+        out_raster = driver.Create(outfile, cols, rows, numlyrs, gdal.GDT_Float32, options=geotiff_creation_options)
         if use_custom_geotransform:
             out_raster.SetGeoTransform(self.output_geotransform)
         else:
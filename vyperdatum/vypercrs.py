@@ -10,6 +10,7 @@ vert.
 """
 
 import os
+from functools import lru_cache
 from typing import Union
 from pyproj.crs import CRS, CompoundCRS, VerticalCRS as pyproj_VerticalCRS
 import pyproj.datadir
@@ -729,10 +730,10 @@ class VyperPipelineCRS:
                         entry = f'{self._hori.name}_ellipse'
                     tmp_crs = VerticalPipelineCRS(datum_data=self.datum_data, vert_datum_name=entry)
                     crs_str = tmp_crs.to_wkt()
-                crs = CRS.from_wkt(crs_str)
+                crs = get_cached_crs(crs_str)
                 self._set_single(crs)
             elif type(entry) == int:
-                crs = CRS.from_epsg(entry)
+                crs = get_cached_crs(entry)
                 self._set_single(crs)
             else:
                 raise ValueError(f'The crs description type {entry} is not recognized.')
@@ -788,11 +789,11 @@ class VyperPipelineCRS:
         elif len(crs.axis_info) > 2:
             # assuming 3D crs if not compound but axis length is > 2. Break into compound crs.
             if crs.to_epsg() == NAD83_3D:  # if 3d nad83, go to 2d nad83
-                self._hori = CRS.from_epsg(NAD83_2D)
+                self._hori = get_cached_crs(NAD83_2D)
             elif crs.to_epsg() == ITRF2008_3D:  # 3d wgs84/itrf2008, go to 2d
-                self._hori = CRS.from_epsg(ITRF2008_2D)
+                self._hori = get_cached_crs(ITRF2008_2D)
             elif crs.to_epsg() == ITRF2014_3D:  # 3d itrf2014, go to 2d
-                self._hori = CRS.from_epsg(ITRF2014_2D)
+                self._hori = get_cached_crs(ITRF2014_2D)
             else:
                 raise NotImplementedError(f'A 3D coordinate system was provided that is not yet implemented: {crs.to_epsg()}')
             self._vert = VerticalPipelineCRS(datum_data=self.datum_data,
@@ -1034,14 +1035,67 @@ def get_transformation_pipeline(in_crs: Union[VyperPipelineCRS, VerticalPipeline
         raise NotImplementedError(f'Unable to build pipeline, datum name not in the datum definition dict, {out_def_str} not in {list(datum_definition.keys())}')
     if region not in out_crs.regions and out_def_str != 'ellipse':
         raise NotImplementedError(f'Unable to build pipeline, region not in output CRS: {region}')
+    return build_regional_pipeline(in_def_str, out_def_str, region, geoid_name, pyproj.datadir.get_data_dir())
+
+
+@lru_cache(maxsize=64)
+def get_cached_crs(crs_definition: Union[str, int]) -> CRS:
+    """
+    Build the pyproj CRS for a wkt string or an epsg code.  Parsing the wkt / looking up the epsg code in the proj
+    database is the expensive part of setting a datum, and the same datums are set again for every file in a batch,
+    so the CRS objects are cached.  pyproj CRS objects are not modified after creation, so sharing them is safe.
+
+    Parameters
+    ----------
+    crs_definition
+        wkt string or integer epsg code
+
+    Returns
+    -------
+    CRS
+        pyproj CRS object for the definition
+    """
+
+    if type(crs_definition) == int:
+        return CRS.from_epsg(crs_definition)
+    return CRS.from_wkt(crs_definition)
+
+
+def build_regional_pipeline(in_def_str: str, out_def_str: str, region: str, geoid_name: str, data_dir: str) -> [str, bool]:
+    """
+    Build and validate the regional pipeline, see get_transformation_pipeline.  Only the pipeline string is cached (see
+    pipeline.get_regional_pipeline), the grids are checked on disk every time so that grids added after the first
+    check are found.
+
+    Parameters
+    ----------
+    in_def_str
+        datum name of the input crs, must be in the datum_definition dictionary
+    out_def_str
+        datum name of the output crs, must be in the datum_definition dictionary
+    region
+        name of the vdatum folder for the region of interest, ex: NYNJhbr34_8301
+    geoid_name
+        name of the geoid used in the pipeline
+    data_dir
+        pyproj data directory string, the grids are searched for in these paths
+
+    Returns
+    -------
+    str
+        PROJ pipeline string, see get_transformation_pipeline
+    bool
+        If the pipeline is considered a valid pipeline
+    """
+
     pipeline = get_regional_pipeline(in_def_str, out_def_str, region, geoid_name)
     valid_pipeline = True
     if pipeline:
-        valid_pipeline, pipeline = is_valid_regional_pipeline(pipeline)
+        valid_pipeline, pipeline = is_valid_regional_pipeline(pipeline, data_dir)
     return pipeline, valid_pipeline
 
 
-def is_valid_regional_pipeline(pipeline: str) -> bool:
+def is_valid_regional_pipeline(pipeline: str, data_dir: str = None) -> bool:
     """
     Confirm all files to perform transformation are available to pyproj.  This function also corrects the pipeline
     for the correct extension that matches the grid as it exists on disk.
@@ -1050,6 +1104,9 @@ def is_valid_regional_pipeline(pipeline: str) -> bool:
     ----------
     pipeline
         pipeline string that we want to validate
+    data_dir
+        optional, pyproj data directory string to search for the grids, if not provided uses the current pyproj data
+        directory
 
     Returns
     -------
@@ -1065,8 +1122,9 @@ def is_valid_regional_pipeline(pipeline: str) -> bool:
         if part.startswith('grids='):
             prefix, grid = part.split('=')
             grid_list.append(grid)
-    paths = pyproj.datadir.get_data_dir()
-    path_list = paths.split(';')
+    if data_dir is None:
+        data_dir = pyproj.datadir.get_data_dir()
+    path_list = data_dir.split(';')
 
     valid = False
     for grid in grid_list: